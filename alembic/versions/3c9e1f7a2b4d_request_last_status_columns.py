@@ -0,0 +1,97 @@
+"""Request last status columns
+
+Revision ID: 3c9e1f7a2b4d
+Revises: 650097e2afbd
+Create Date: 2026-10-18 09:12:31.504116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9e1f7a2b4d'
+down_revision: Union[str, None] = '650097e2afbd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('requests', sa.Column('last_status_change', sa.String(length=20), nullable=True))
+    op.add_column('requests', sa.Column('last_status_change_at', sa.DateTime(), nullable=True))
+    op.add_column('requests', sa.Column('last_status_comment', sa.Text(), nullable=True))
+    op.add_column('requests', sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill outside the DDL transaction, one committed batch of ids at a time
+    with op.get_context().autocommit_block():
+        _backfill()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('requests', 'comment_count')
+    op.drop_column('requests', 'last_status_comment')
+    op.drop_column('requests', 'last_status_change_at')
+    op.drop_column('requests', 'last_status_change')
+
+
+def _backfill() -> None:
+    bind = op.get_bind()
+    requests = sa.table(
+        'requests',
+        sa.column('id', sa.Integer),
+        sa.column('last_status_change', sa.String),
+        sa.column('last_status_change_at', sa.DateTime),
+        sa.column('last_status_comment', sa.Text),
+        sa.column('comment_count', sa.Integer),
+    )
+    audit_requests = sa.table(
+        'audit_requests',
+        sa.column('id', sa.Integer),
+        sa.column('request_id', sa.Integer),
+        sa.column('action', sa.String),
+        sa.column('new_status', sa.String),
+        sa.column('comment', sa.Text),
+        sa.column('created_at', sa.DateTime),
+    )
+    comment_requests = sa.table(
+        'comment_requests',
+        sa.column('id', sa.Integer),
+        sa.column('request_id', sa.Integer),
+    )
+
+    def last_status_change(column):
+        return (
+            sa.select(column)
+            .where(
+                audit_requests.c.request_id == requests.c.id,
+                audit_requests.c.action == 'status_change',
+            )
+            .order_by(audit_requests.c.created_at.desc(), audit_requests.c.id.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+
+    comment_count = (
+        sa.select(sa.func.count(comment_requests.c.id))
+        .where(comment_requests.c.request_id == requests.c.id)
+        .scalar_subquery()
+    )
+
+    max_id = bind.execute(sa.select(sa.func.max(requests.c.id))).scalar() or 0
+    for low in range(0, max_id, BACKFILL_BATCH_SIZE):
+        bind.execute(
+            requests.update()
+            .where(requests.c.id > low, requests.c.id <= low + BACKFILL_BATCH_SIZE)
+            .values(
+                last_status_change=last_status_change(audit_requests.c.new_status),
+                last_status_change_at=last_status_change(audit_requests.c.created_at),
+                last_status_comment=last_status_change(audit_requests.c.comment),
+                comment_count=comment_count,
+            )
+        )
@@ -0,0 +1,44 @@
+"""Request, audit and comment indexes
+
+Revision ID: 5b7e9c3d1f28
+Revises: 8d2f4a6c1e90
+Create Date: 2026-10-18 14:21:05.604127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7e9c3d1f28'
+down_revision: Union[str, None] = '8d2f4a6c1e90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_requests_user_id_id'), 'requests', ['user_id', 'id'], unique=False, mssql_include=['amount', 'status'])
+    op.create_index(op.f('ix_requests_supervisor_id_id'), 'requests', ['supervisor_id', 'id'], unique=False)
+    op.create_index(op.f('ix_requests_supervisor_id_status'), 'requests', ['supervisor_id', 'status', 'created_at'], unique=False)
+    op.create_index(op.f('ix_requests_status_created_at'), 'requests', ['status', 'created_at'], unique=False)
+    op.create_index(op.f('ix_requests_created_at'), 'requests', ['created_at'], unique=False)
+    op.create_index(op.f('ix_audit_requests_request_id_action_created_at'), 'audit_requests', ['request_id', 'action', 'created_at'], unique=False)
+    op.create_index(op.f('ix_audit_requests_user_id_created_at'), 'audit_requests', ['user_id', 'created_at'], unique=False)
+    op.create_index(op.f('ix_audit_requests_created_at'), 'audit_requests', ['created_at'], unique=False)
+    op.create_index(op.f('ix_comment_requests_request_id'), 'comment_requests', ['request_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_comment_requests_request_id'), table_name='comment_requests')
+    op.drop_index(op.f('ix_audit_requests_created_at'), table_name='audit_requests')
+    op.drop_index(op.f('ix_audit_requests_user_id_created_at'), table_name='audit_requests')
+    op.drop_index(op.f('ix_audit_requests_request_id_action_created_at'), table_name='audit_requests')
+    op.drop_index(op.f('ix_requests_created_at'), table_name='requests')
+    op.drop_index(op.f('ix_requests_status_created_at'), table_name='requests')
+    op.drop_index(op.f('ix_requests_supervisor_id_status'), table_name='requests')
+    op.drop_index(op.f('ix_requests_supervisor_id_id'), table_name='requests')
+    op.drop_index(op.f('ix_requests_user_id_id'), table_name='requests')
@@ -0,0 +1,61 @@
+"""User request stats
+
+Revision ID: 8d2f4a6c1e90
+Revises: 3c9e1f7a2b4d
+Create Date: 2026-10-18 10:03:47.218553
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2f4a6c1e90'
+down_revision: Union[str, None] = '3c9e1f7a2b4d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_request_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total_requests', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('approved_requests', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('rejected_requests', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('pending_requests', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('amount_sum', sa.Float(), server_default='0', nullable=False),
+    sa.Column('amount_min', sa.Float(), nullable=True),
+    sa.Column('amount_max', sa.Float(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.execute(
+        """
+        INSERT INTO user_request_stats (
+            user_id, total_requests, approved_requests, rejected_requests,
+            pending_requests, amount_sum, amount_min, amount_max, updated_at
+        )
+        SELECT
+            u.id,
+            COUNT(r.id),
+            COALESCE(SUM(CASE WHEN r.status = 'aprobado' THEN 1 ELSE 0 END), 0),
+            COALESCE(SUM(CASE WHEN r.status = 'rechazado' THEN 1 ELSE 0 END), 0),
+            COALESCE(SUM(CASE WHEN r.status = 'pendiente' THEN 1 ELSE 0 END), 0),
+            COALESCE(SUM(r.amount), 0),
+            MIN(r.amount),
+            MAX(r.amount),
+            COALESCE(MAX(r.updated_at), CURRENT_TIMESTAMP)
+        FROM users u
+        LEFT JOIN requests r ON r.user_id = u.id
+        GROUP BY u.id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_request_stats')
@@ -0,0 +1,45 @@
+"""Audit requests archive
+
+Revision ID: a4c81e2f6d37
+Revises: 5b7e9c3d1f28
+Create Date: 2026-10-18 15:02:41.093318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c81e2f6d37'
+down_revision: Union[str, None] = '5b7e9c3d1f28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('audit_requests_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('action', sa.String(length=20), nullable=False),
+    sa.Column('previous_status', sa.String(length=20), nullable=True),
+    sa.Column('new_status', sa.String(length=20), nullable=True),
+    sa.Column('comment', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('request_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_audit_requests_archive_request_id_created_at'), 'audit_requests_archive', ['request_id', 'created_at'], unique=False)
+    op.create_index(op.f('ix_audit_requests_archive_user_id_created_at'), 'audit_requests_archive', ['user_id', 'created_at'], unique=False)
+    op.create_index(op.f('ix_audit_requests_archive_created_at'), 'audit_requests_archive', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_audit_requests_archive_created_at'), table_name='audit_requests_archive')
+    op.drop_index(op.f('ix_audit_requests_archive_user_id_created_at'), table_name='audit_requests_archive')
+    op.drop_index(op.f('ix_audit_requests_archive_request_id_created_at'), table_name='audit_requests_archive')
+    op.drop_table('audit_requests_archive')
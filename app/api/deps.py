@@ -1,68 +1,79 @@
-from typing import Generator, Optional
+from typing import Optional
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt
-from pydantic import ValidationError
-from sqlalchemy.orm import Session
-from app import crud, models, schemas
+from app import crud
+from app.crud import async_crud_user
 from app.core import security
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.core.principal import Principal, principal_cache
+from app.core.roles import role_catalogue
+from app.db.session import AsyncSessionLocal, SessionLocal, get_async_db, get_db
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login/access-token"
 )
 
-def get_db() -> Generator:
+def _load_principal(user_id: int) -> Optional[Principal]:
+    db = SessionLocal()
     try:
-        db = SessionLocal()
-        yield db
+        role_catalogue.refresh_if_stale(db)
+        user = crud.crud_user.get_user(db, user_id=user_id)
+        return Principal.from_user(user) if user else None
     finally:
         db.close()
 
-def get_current_user(
-    db: Session = Depends(get_db),
+async def _load_principal_async(user_id: int) -> Optional[Principal]:
+    async with AsyncSessionLocal() as db:
+        await db.run_sync(role_catalogue.refresh_if_stale)
+        user = await async_crud_user.get_user(db, user_id=user_id)
+        return Principal.from_user(user) if user else None
+
+async def get_current_user(
     token: str = Depends(reusable_oauth2)
-) -> models.User:
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
-        )
-        token_data = schemas.token.TokenPayload(**payload)
-    except (jwt.JWTError, ValidationError):
+) -> Principal:
+    token_data = security.decode_token(token)
+    if token_data is None:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = crud.crud_user.get_user(db, user_id=token_data.sub)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    return user
+    principal = principal_cache.get(token_data.sub)
+    if principal is None:
+        # Only cache misses touch the database
+        if settings.DB_ASYNC:
+            principal = await _load_principal_async(token_data.sub)
+        else:
+            principal = await run_in_threadpool(_load_principal, token_data.sub)
+        if not principal:
+            raise HTTPException(status_code=404, detail="User not found")
+        principal_cache.set(principal.id, principal)
+    return principal
 
-def get_current_active_user(
-    current_user: models.User = Depends(get_current_user),
-) -> models.User:
+async def get_current_active_user(
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
-def get_current_active_superuser(
-    current_user: models.User = Depends(get_current_user),
-) -> models.User:
+async def get_current_active_superuser(
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    if not any(role.name == "supervisor" for role in current_user.roles):
+    if not current_user.has_role("supervisor"):
         raise HTTPException(
             status_code=400, detail="The user doesn't have enough privileges"
         )
     return current_user
 
 def has_role(role_name: str):
-    def role_checker(current_user: models.User = Depends(get_current_active_user)) -> models.User:
-        if not any(role.name == role_name for role in current_user.roles):
+    async def role_checker(current_user: Principal = Depends(get_current_active_user)) -> Principal:
+        if not current_user.has_role(role_name):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"User must have {role_name} role to access this endpoint"
             )
         return current_user
-    return role_checker 
\ No newline at end of file
+    return role_checker
\ No newline at end of file
@@ -1,9 +1,35 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import users, roles, auth, requests, audit
+from app.api.v1.endpoints import users, roles, auth, requests, audit, internal
+from app.api.v1.endpoints import auth_async, requests_async
+from app.core.config import settings
+
+
+def _override_routes(router: APIRouter, overrides: APIRouter) -> None:
+    """
+    Drop the routes of `router` that `overrides` serves on the same path and method.
+    """
+    overridden = {
+        (route.path, method) for route in overrides.routes for method in route.methods
+    }
+    router.routes = [
+        route for route in router.routes
+        if not any((route.path, method) in overridden for method in getattr(route, "methods", ()))
+    ]
+
+
+if settings.DB_ASYNC:
+    _override_routes(auth.router, auth_async.router)
+    _override_routes(requests.router, requests_async.router)
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(roles.router, prefix="/roles", tags=["roles"])
 api_router.include_router(requests.router, prefix="/requests", tags=["requests"])
-api_router.include_router(audit.router, prefix="/audit", tags=["audit"]) 
\ No newline at end of file
+api_router.include_router(audit.router, prefix="/audit", tags=["audit"])
+api_router.include_router(internal.router, prefix="/internal", tags=["internal"])
+if settings.DB_ASYNC:
+    # Mounted after the sync routers so fixed paths like /requests/user-stats
+    # still win over /requests/{request_id}
+    api_router.include_router(auth_async.router, prefix="/auth", tags=["auth"])
+    api_router.include_router(requests_async.router, prefix="/requests", tags=["requests"])
@@ -1,8 +1,10 @@
+from datetime import date, datetime, time, timedelta
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app import crud, schemas
 from app.api import deps
+from app.schemas.serializers import audit_dict, json_response
 
 router = APIRouter()
 
@@ -13,10 +15,14 @@ def read_audit_logs(
     limit: int = 100,
     request_id: Optional[int] = None,
     user_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
     current_user: schemas.user.User = Depends(deps.has_role("supervisor")),
 ) -> List[schemas.audit.AuditRequest]:
     """
-    Retrieve audit logs.
+    Retrieve audit logs, newest first, optionally between `start_date` and
+    `end_date` (both inclusive). Archived entries are included when the
+    range reaches them.
     Only supervisors can access this endpoint.
     """
     audit_logs = crud.audit.get_multi(
@@ -24,6 +30,8 @@ def read_audit_logs(
         skip=skip,
         limit=limit,
         request_id=request_id,
-        user_id=user_id
+        user_id=user_id,
+        created_from=datetime.combine(start_date, time.min) if start_date else None,
+        created_before=datetime.combine(end_date + timedelta(days=1), time.min) if end_date else None
     )
-    return audit_logs 
\ No newline at end of file
+    return json_response([audit_dict(audit) for audit in audit_logs])
@@ -0,0 +1,50 @@
+from typing import Any
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import schemas
+from app.api import deps
+from app.core import security
+from app.crud import async_crud_user
+
+# AsyncSession variant of the login route in auth.py, mounted in its place
+# when settings.DB_ASYNC is enabled
+router = APIRouter()
+
+@router.post("/login", response_model=schemas.token.Token)
+async def login(
+    db: AsyncSession = Depends(deps.get_async_db),
+    form_data: OAuth2PasswordRequestForm = Depends()
+) -> Any:
+    """
+    OAuth2 compatible token login, get an access token for future requests
+    """
+    user = await async_crud_user.get_user_by_email(db, email=form_data.username)
+    if not user or not await security.verify_password_async(form_data.password, user.hashed_password):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+    
+    # Get role information
+    role_names = [role.name for role in user.roles]
+    role_name = role_names[0] if role_names else "No Role"
+    
+    access_token = security.create_access_token(user.id)
+    refresh_token = security.create_refresh_token(user.id)
+    
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+        "user_id": user.id,
+        "full_name": user.full_name,
+        "role_name": role_name,
+        "roles": role_names
+    }
@@ -0,0 +1,64 @@
+from typing import Any, Dict, List
+from fastapi import APIRouter, Depends
+from app import schemas
+from app.api import deps
+from app.core import security
+from app.core.principal import principal_cache
+from app.core.request_stats import route_stats
+from app.core.response_cache import request_list_cache
+from app.core.roles import role_catalogue
+from app.db.audit_writer import audit_writer
+from app.db.session import get_pool_stats
+
+router = APIRouter()
+
+@router.get("/caches")
+def read_cache_stats(
+    current_user: schemas.user.User = Depends(deps.get_current_active_superuser),
+) -> Dict[str, Any]:
+    """
+    Size and hit/miss counters of the in-process caches.
+    """
+    return {
+        "principal": principal_cache.stats(),
+        "token": security.token_cache.stats(),
+        "request_list": request_list_cache.stats(),
+        "roles": role_catalogue.stats(),
+    }
+
+@router.get("/password-hashing")
+def read_password_hashing_stats(
+    current_user: schemas.user.User = Depends(deps.get_current_active_superuser),
+) -> Dict[str, Any]:
+    """
+    Queue depth, rejections and latency of the password hashing pool.
+    """
+    return security.get_password_hash_stats()
+
+@router.get("/db-pool")
+def read_db_pool_stats(
+    current_user: schemas.user.User = Depends(deps.get_current_active_superuser),
+) -> Dict[str, Any]:
+    """
+    Connection pool occupancy, checkout wait times and timeouts per engine.
+    """
+    return get_pool_stats()
+
+@router.get("/audit-queue")
+def read_audit_queue_stats(
+    current_user: schemas.user.User = Depends(deps.get_current_active_superuser),
+) -> Dict[str, Any]:
+    """
+    Rows waiting in the audit write-behind queue and flush counters.
+    """
+    return audit_writer.stats()
+
+@router.get("/db-routes")
+def read_db_route_stats(
+    current_user: schemas.user.User = Depends(deps.get_current_active_superuser),
+) -> List[Dict[str, Any]]:
+    """
+    SQL statements, database time and rows fetched per route template, busiest
+    routes first.
+    """
+    return route_stats.snapshot()
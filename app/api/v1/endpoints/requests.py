@@ -1,16 +1,61 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Response
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Response
+from pydantic import ValidationError
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from app import crud, schemas
 from app.api import deps
-from app.models import CommentRequest, AuditRequest
-from datetime import date
+from app.core.config import settings
+from app.core.etag import etag_matches
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.response_cache import request_list_cache, request_list_scopes
+from app.crud.base import unit_of_work
+from app.schemas.serializers import dumps, json_response, request_dict, sparse_request_dict
+from app.db.session import SessionLocal, engine
+from datetime import date, datetime
 import csv
-import io
+import zlib
 
 router = APIRouter()
 
+def request_page_key(
+        *, skip: int, limit: int, user_id: Optional[int], supervisor_id: Optional[int],
+        after_id: Optional[int], fields: Sequence[str], include: Sequence[str]
+) -> Any:
+    """Key of a GET /requests page in request_list_cache."""
+    if after_id is not None:
+        skip = 0
+    return request_list_cache.key(
+        (skip, limit, user_id, supervisor_id, after_id, tuple(fields), tuple(include)),
+        request_list_scopes(user_id, supervisor_id)
+    )
+
+
+def is_full_fieldset(fields: Sequence[str], include: Sequence[str]) -> bool:
+    return (
+        tuple(fields) == crud.crud_request.REQUEST_FIELDS
+        and tuple(include) == crud.crud_request.REQUEST_INCLUDES
+    )
+
+
+def render_request_page(
+        requests: List[Any], limit: int, fields: Sequence[str], include: Sequence[str]
+) -> Any:
+    """(JSON body, next cursor) of a page, as stored in request_list_cache."""
+    if is_full_fieldset(fields, include):
+        body = dumps([request_dict(request) for request in requests])
+    else:
+        body = dumps([sparse_request_dict(request, fields, include) for request in requests])
+    next_cursor = encode_cursor(requests[-1].id) if limit > 0 and len(requests) == limit else None
+    return body, next_cursor
+
+
+def request_page_response(page: Any) -> Response:
+    body, next_cursor = page
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return Response(content=body, media_type="application/json", headers=headers)
+
 
 @router.post("/", response_model=schemas.request.Request)
 def create_request(
@@ -24,29 +69,82 @@ def create_request(
     """
     # Si el usuario es supervisor, se asigna como supervisor de la solicitud
     supervisor_id = None
-    if any(role.name == "supervisor" for role in current_user.roles):
+    if current_user.has_role("supervisor"):
         supervisor_id = current_user.id
 
-    # Crear la solicitud con el usuario actual
-    request = crud.crud_request.create_with_user(
-        db=db,
-        obj_in=request_in,
-        user_id=current_user.id,
-        supervisor_id=supervisor_id
-    )
+    # Crear la solicitud con el usuario actual y registrarla en auditoría
+    with unit_of_work(db):
+        request = crud.crud_request.create_with_audit(
+            db=db,
+            obj_in=request_in,
+            user_id=current_user.id,
+            supervisor_id=supervisor_id
+        )
+    return request
 
-    # Registrar en auditoría
-    audit = AuditRequest(
-        action="create",
-        new_status=request.status,
-        request_id=request.id,
-        user_id=current_user.id
-    )
-    db.add(audit)
-    db.commit()
-    db.refresh(audit)
 
-    return request
+# The items are validated one by one in the endpoint, so that an invalid
+# item is reported by index instead of failing the call; the body is still
+# documented as a list of RequestCreate
+BULK_CREATE_OPENAPI: Dict[str, Any] = {
+    "requestBody": {
+        "content": {
+            "application/json": {
+                "schema": {
+                    "type": "array",
+                    "maxItems": settings.BULK_MAX_ITEMS,
+                    "items": {"$ref": "#/components/schemas/RequestCreate"},
+                }
+            }
+        }
+    }
+}
+
+
+@router.post("/bulk", response_model=schemas.request.BulkResult, openapi_extra=BULK_CREATE_OPENAPI)
+def create_requests_bulk(
+        *,
+        db: Session = Depends(deps.get_db),
+        items: List[Any] = Body(...),
+        current_user: schemas.user.User = Depends(deps.get_current_active_user),
+) -> schemas.request.BulkResult:
+    """
+    Create many requests in one call. Each item is validated on its own;
+    valid items are inserted in batches with their audit entries and
+    invalid ones are reported by index.
+    """
+    if len(items) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.BULK_MAX_ITEMS} items can be created per call"
+        )
+
+    supervisor_id = None
+    if current_user.has_role("supervisor"):
+        supervisor_id = current_user.id
+
+    results: List[schemas.request.BulkItemResult] = []
+    valid: List[schemas.request.RequestCreate] = []
+    for index, item in enumerate(items):
+        try:
+            valid.append(schemas.request.RequestCreate.model_validate(item))
+            results.append(schemas.request.BulkItemResult(index=index))
+        except ValidationError as e:
+            results.append(schemas.request.BulkItemResult(
+                index=index, errors=e.errors(include_url=False, include_context=False)
+            ))
+
+    with unit_of_work(db):
+        ids = crud.crud_request.create_bulk(
+            db=db, objs_in=valid, user_id=current_user.id, supervisor_id=supervisor_id
+        )
+    created = iter(ids)
+    for result in results:
+        if result.errors is None:
+            result.id = next(created)
+    return schemas.request.BulkResult(
+        created=len(ids), failed=len(items) - len(ids), results=results
+    )
 
 
 @router.get("/", response_model=List[schemas.request.Request])
@@ -54,17 +152,77 @@ def read_requests(
         db: Session = Depends(deps.get_db),
         skip: int = 0,
         limit: int = 100,
+        cursor: Optional[str] = None,
         user_id: Optional[int] = None,
         supervisor_id: Optional[int] = None,
+        fields: Optional[str] = None,
+        include: Optional[str] = None,
         # current_user: schemas.user.User = Depends(deps.has_role("supervisor")),
 ) -> List[schemas.request.Request]:
     """
     Retrieve requests. Only supervisors can list requests.
+    Pass the `X-Next-Cursor` header of a page as `cursor` to get the next one;
+    `skip` is ignored when a cursor is given.
+    `fields` (e.g. `id,title,status,amount,expected_date`) and `include`
+    (`user`, `comments`) narrow the columns and relationships that are read
+    and returned; `fields` alone returns no relationships.
+    Pages are served from request_list_cache until a write touches them.
     """
-    requests = crud.crud_request.get_multi(
-        db=db, skip=skip, limit=limit, user_id=user_id, supervisor_id=supervisor_id
+    try:
+        after_id = decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    try:
+        fields_, include_ = crud.crud_request.parse_fieldset(fields, include)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    key = request_page_key(
+        skip=skip, limit=limit, user_id=user_id, supervisor_id=supervisor_id, after_id=after_id,
+        fields=fields_, include=include_
     )
-    return requests
+    page = request_list_cache.get(key)
+    if page is None:
+        if is_full_fieldset(fields_, include_):
+            requests = crud.crud_request.get_multi(
+                db=db, skip=skip, limit=limit, user_id=user_id, supervisor_id=supervisor_id,
+                after_id=after_id
+            )
+        else:
+            requests = crud.crud_request.get_sparse_multi(
+                db=db, fields=fields_, include=include_, skip=skip, limit=limit,
+                user_id=user_id, supervisor_id=supervisor_id, after_id=after_id
+            )
+        page = render_request_page(requests, limit, fields_, include_)
+        request_list_cache.set(key, page)
+    return request_page_response(page)
+
+
+@router.get("/user-stats", response_model=List[schemas.request.UserRequestStats])
+def read_user_stats(
+        db: Session = Depends(deps.get_db),
+        user_id: Optional[int] = None,
+        current_user: schemas.user.User = Depends(deps.has_role("supervisor")),
+) -> List[schemas.request.UserRequestStats]:
+    """
+    Per-user request statistics, read from the precomputed user_request_stats table.
+    Only supervisors can access this endpoint.
+    """
+    rows = db.execute(crud.crud_user_stats.stats_statement(user_id=user_id)).all()
+    return [
+        schemas.request.UserRequestStats(
+            user_id=row.UserId,
+            email=row.UserEmail,
+            full_name=row.UserName,
+            total_requests=row.TotalRequests,
+            approved_requests=row.ApprovedRequests,
+            rejected_requests=row.RejectedRequests,
+            pending_requests=row.PendingRequests,
+            average_amount=row.AverageAmount,
+            max_amount=row.MaxAmount,
+            min_amount=row.MinAmount,
+        )
+        for row in rows
+    ]
 
 
 @router.get("/{request_id}", response_model=schemas.request.Request)
@@ -72,15 +230,22 @@ def read_request(
         *,
         db: Session = Depends(deps.get_db),
         request_id: int,
+        if_none_match: Optional[str] = Header(None),
         current_user: schemas.user.User = Depends(deps.get_current_active_user),
 ) -> schemas.request.Request:
     """
     Get request by ID.
+    Returns 304 without a body when `If-None-Match` holds the current `ETag`.
     """
+    etag = crud.crud_request.get_etag(db=db, id=request_id)
+    if not etag:
+        raise HTTPException(status_code=404, detail="Request not found")
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
     request = crud.crud_request.get(db=db, id=request_id)
     if not request:
         raise HTTPException(status_code=404, detail="Request not found")
-    return request
+    return json_response(request_dict(request), headers={"ETag": etag})
 
 
 @router.put("/{request_id}", response_model=schemas.request.Request)
@@ -89,15 +254,23 @@ def update_request(
         db: Session = Depends(deps.get_db),
         request_id: int,
         request_in: schemas.request.RequestUpdate,
+        response: Response,
+        if_match: Optional[str] = Header(None),
         current_user: schemas.user.User = Depends(deps.get_current_active_user),
 ) -> schemas.request.Request:
     """
     Update a request.
+    With `If-Match`, the update is refused with 412 unless it holds the
+    current `ETag` of the request.
     """
     request = crud.crud_request.get(db=db, id=request_id)
     if not request:
         raise HTTPException(status_code=404, detail="Request not found")
-    request = crud.crud_request.update(db=db, db_obj=request, obj_in=request_in)
+    with unit_of_work(db):
+        if if_match and not etag_matches(if_match, crud.crud_request.get_etag(db=db, id=request_id)):
+            raise HTTPException(status_code=412, detail="Request was modified since it was read")
+        request = crud.crud_request.update(db=db, db_obj=request, obj_in=request_in)
+    response.headers["ETag"] = crud.crud_request.get_etag(db=db, id=request_id)
     return request
 
 
@@ -120,53 +293,55 @@ def change_status_request(
     if not request:
         raise HTTPException(status_code=404, detail="Request not found")
     
-    # Validar que el status sea "aprobado" o "rechazado"
-    if request_in.status not in ["aprobado", "rechazado"]:
-        raise HTTPException(
-            status_code=400,
-            detail="Status must be either 'aprobado' or 'rechazado'"
-        )
+    # Validar el estado y la obligatoriedad del comentario
+    error = crud.crud_request.status_change_error(request, request_in)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
     
-    # Validar que se requiera comentario
-    requires_comment = request.amount > 500 or request_in.status == "rechazado"
-    if requires_comment and not request_in.comment:
+    # Comentario, auditoría y actualización de la solicitud en una sola transacción
+    with unit_of_work(db):
+        request = crud.crud_request.change_status(
+            db=db,
+            db_obj=request,
+            obj_in=request_in,
+            user_id=current_user.id
+        )
+    return request
+
+
+@router.put("/status/bulk", response_model=schemas.request.BulkStatusResult)
+def change_status_requests_bulk(
+        *,
+        db: Session = Depends(deps.get_db),
+        request_in: schemas.request.RequestStatusBulk,
+        current_user: schemas.user.User = Depends(deps.has_role("supervisor")),
+) -> schemas.request.BulkStatusResult:
+    """
+    Approve or reject many requests at once. Only supervisors can do it.
+    The same comment rules as for a single request apply; requests that
+    fail them, or do not exist, are reported by id and left unchanged.
+    """
+    if len(request_in.ids) > settings.BULK_MAX_ITEMS:
         raise HTTPException(
             status_code=400,
-            detail="Comment is required" if request_in.status=="rechazado" else "Comment is required for rejected requests or requests with amount greater than 500"
+            detail=f"At most {settings.BULK_MAX_ITEMS} requests can be changed per call"
         )
-    
-    # Crear el comentario si se proporciona
-    if request_in.comment:
-        comment = CommentRequest(
-            comment=request_in.comment,
-            request_id=request_id,
-            user_id=current_user.id
+    error = crud.crud_request.status_error(request_in)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+
+    with unit_of_work(db):
+        errors = crud.crud_request.change_status_bulk(
+            db=db, obj_in=request_in, user_id=current_user.id
         )
-        db.add(comment)
-        db.commit()
-        db.refresh(comment)
-    
-    # Registrar en auditoría antes de actualizar
-    audit = AuditRequest(
-        action="status_change",
-        previous_status=request.status,
-        new_status=request_in.status,
-        comment=request_in.comment,
-        request_id=request_id,
-        user_id=current_user.id
+    results = [
+        schemas.request.BulkStatusItemResult(id=request_id, error=error)
+        for request_id, error in errors.items()
+    ]
+    failed = sum(1 for result in results if result.error)
+    return schemas.request.BulkStatusResult(
+        updated=len(results) - failed, failed=failed, results=results
     )
-    db.add(audit)
-    
-    # Actualizar la solicitud
-    request = crud.crud_request.update(
-        db=db,
-        db_obj=request,
-        obj_in=request_in
-    )
-    
-    db.commit()
-    db.refresh(audit)
-    return request
 
 
 @router.delete("/{request_id}", response_model=dict)
@@ -179,113 +354,156 @@ def delete_request(
     """
     Delete a request.
     """
-    request = crud.crud_request.get(db=db, id=request_id)
+    request = crud.crud_request.get(db=db, id=request_id, options=())
     if not request:
         raise HTTPException(status_code=404, detail="Request not found")
-    crud.crud_request.remove(db=db, id=request_id)
+    crud.crud_request.delete_request(db=db, request_id=request_id)
     return {"message": "Request deleted successfully"}
 
 
+def _iter_csv(
+    statement: Any,
+    params: Dict[str, Any],
+    header: List[str],
+    row_values: Callable[[Any], List[Any]],
+    compress: bool = False,
+) -> Iterator[bytes]:
+    """
+    Run `statement` and yield the CSV output in chunks of
+    `settings.CSV_EXPORT_CHUNK_SIZE` rows, optionally gzip-compressed.
+    Uses its own session because the request-scoped one is closed before a
+    streaming body is sent.
+    """
+    writer = csv.writer(_EchoBuffer())
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+
+    def encode(text_chunk: str) -> bytes:
+        data = text_chunk.encode("utf-8")
+        return compressor.compress(data) if compressor else data
+
+    db = SessionLocal()
+    try:
+        result = db.connection(
+            execution_options={"stream_results": True}
+        ).execute(statement, params)
+        yield encode(writer.writerow(header))
+        while True:
+            rows = result.fetchmany(settings.CSV_EXPORT_CHUNK_SIZE)
+            if not rows:
+                break
+            chunk = encode("".join(writer.writerow(row_values(row)) for row in rows))
+            if chunk:
+                yield chunk
+        if compressor:
+            yield compressor.flush()
+    finally:
+        db.close()
+
+
+class _EchoBuffer:
+    """File-like object that hands back whatever csv.writer writes to it."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def _csv_response(rows: Iterator[bytes], filename: str, compress: bool) -> StreamingResponse:
+    if compress:
+        return StreamingResponse(
+            rows,
+            media_type="application/gzip",
+            headers={"Content-Disposition": f"attachment; filename={filename}.gz"}
+        )
+    return StreamingResponse(
+        rows,
+        media_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
 @router.get("/report/csv")
 def download_request_report(
-    db: Session = Depends(deps.get_db),
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     status: Optional[str] = None,
     user_id: Optional[int] = None,
+    gzip: bool = False,
     current_user: schemas.user.User = Depends(deps.has_role("supervisor")),
-) -> Response:
+) -> StreamingResponse:
     """
     Download request report in CSV format.
     Only supervisors can access this endpoint.
+    Set `gzip=true` to receive the report gzip-compressed.
     """
-    # Execute the stored procedure
-    result = db.execute(
-        text("EXEC sp_GetRequestReport @StartDate=:start_date, @EndDate=:end_date, @Status=:status, @UserId=:user_id"),
-        {
-            "start_date": start_date,
-            "end_date": end_date,
-            "status": status,
-            "user_id": user_id
-        }
-    ).fetchall()
-
-    # Create CSV in memory
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Write header
-    writer.writerow([
+    header = [
         "Request ID", "Title", "Description", "Status", "Amount", 
         "Expected Date", "Created At", "Updated At",
         "Creator Email", "Creator Name",
         "Supervisor Email", "Supervisor Name",
         "Last Status Change", "Last Status Change Date", "Last Status Comment",
         "Comment Count", "Days Since Creation", "Days Until Expected Date"
-    ])
-    
-    # Write data
-    for row in result:
-        writer.writerow([
+    ]
+
+    params = {
+        "start_date": start_date,
+        "end_date": end_date,
+        "status": status,
+        "user_id": user_id
+    }
+    if engine.dialect.name == "mssql":
+        statement = text("EXEC sp_GetRequestReport @StartDate=:start_date, @EndDate=:end_date, @Status=:status, @UserId=:user_id")
+
+        def day_counts(row: Any) -> List[Any]:
+            return [row.DaysSinceCreation, row.DaysUntilExpectedDate]
+    else:
+        # Sin procedimientos almacenados (p. ej. SQLite en benchmarks)
+        statement = crud.crud_request.report_statement(**params)
+        params = {}
+
+        def day_counts(row: Any) -> List[Any]:
+            today = datetime.now().date()
+            return [
+                (today - row.RequestCreatedAt.date()).days,
+                (row.ExpectedDate - today).days if row.ExpectedDate else None
+            ]
+
+    def row_values(row: Any) -> List[Any]:
+        return [
             row.RequestId, row.RequestTitle, row.RequestDescription,
             row.RequestStatus, row.RequestAmount, row.ExpectedDate,
             row.RequestCreatedAt, row.RequestUpdatedAt,
             row.RequestCreatorEmail, row.RequestCreatorName,
             row.SupervisorEmail, row.SupervisorName,
             row.LastStatusChange, row.LastStatusChangeDate, row.LastStatusComment,
-            row.CommentCount, row.DaysSinceCreation, row.DaysUntilExpectedDate
-        ])
-    
-    # Prepare response
-    output.seek(0)
-    return Response(
-        content=output.getvalue(),
-        media_type="text/csv",
-        headers={
-            "Content-Disposition": "attachment; filename=request_report.csv"
-        }
-    )
+            row.CommentCount, *day_counts(row)
+        ]
+
+    rows = _iter_csv(statement, params, header, row_values, compress=gzip)
+    return _csv_response(rows, "request_report.csv", gzip)
 
 
 @router.get("/user-stats/csv")
 def download_user_stats_report(
-    db: Session = Depends(deps.get_db),
+    gzip: bool = False,
     current_user: schemas.user.User = Depends(deps.has_role("supervisor")),
-) -> Response:
+) -> StreamingResponse:
     """
     Download user request statistics report in CSV format.
     Only supervisors can access this endpoint.
+    Set `gzip=true` to receive the report gzip-compressed.
     """
-    # Execute the stored procedure
-    result = db.execute(
-        text("EXEC sp_GetUserRequestStats")
-    ).fetchall()
-
-    # Create CSV in memory
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Write header
-    writer.writerow([
+    header = [
         "User ID", "Email", "Name", 
         "Total Requests", "Approved Requests", "Rejected Requests", "Pending Requests",
         "Average Amount", "Max Amount", "Min Amount"
-    ])
-    
-    # Write data
-    for row in result:
-        writer.writerow([
+    ]
+
+    def row_values(row: Any) -> List[Any]:
+        return [
             row.UserId, row.UserEmail, row.UserName,
             row.TotalRequests, row.ApprovedRequests, row.RejectedRequests, row.PendingRequests,
             row.AverageAmount, row.MaxAmount, row.MinAmount
-        ])
-    
-    # Prepare response
-    output.seek(0)
-    return Response(
-        content=output.getvalue(),
-        media_type="text/csv",
-        headers={
-            "Content-Disposition": "attachment; filename=user_stats_report.csv"
-        }
-    )
+        ]
+
+    rows = _iter_csv(crud.crud_user_stats.stats_statement(), {}, header, row_values, compress=gzip)
+    return _csv_response(rows, "user_stats_report.csv", gzip)
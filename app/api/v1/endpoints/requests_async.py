@@ -0,0 +1,144 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import crud, schemas
+from app.api import deps
+from app.core.etag import etag_matches
+from app.api.v1.endpoints.requests import (
+    is_full_fieldset, render_request_page, request_page_key, request_page_response
+)
+from app.core.pagination import decode_cursor
+from app.core.response_cache import request_list_cache
+from app.crud import async_crud_request
+from app.schemas.serializers import json_response, request_dict
+
+# AsyncSession variants of the hot routes in requests.py, mounted in their
+# place when settings.DB_ASYNC is enabled
+router = APIRouter()
+
+
+@router.post("/", response_model=schemas.request.Request)
+async def create_request(
+        *,
+        db: AsyncSession = Depends(deps.get_async_db),
+        request_in: schemas.request.RequestCreate,
+        current_user: schemas.user.User = Depends(deps.get_current_active_user),
+) -> schemas.request.Request:
+    """
+    Create new request.
+    """
+    # Si el usuario es supervisor, se asigna como supervisor de la solicitud
+    supervisor_id = None
+    if current_user.has_role("supervisor"):
+        supervisor_id = current_user.id
+
+    request = await async_crud_request.create_with_audit(
+        db=db,
+        obj_in=request_in,
+        user_id=current_user.id,
+        supervisor_id=supervisor_id
+    )
+    return await async_crud_request.get(db=db, id=request.id, populate_existing=True)
+
+
+@router.get("/", response_model=List[schemas.request.Request])
+async def read_requests(
+        db: AsyncSession = Depends(deps.get_async_db),
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        user_id: Optional[int] = None,
+        supervisor_id: Optional[int] = None,
+        fields: Optional[str] = None,
+        include: Optional[str] = None,
+) -> List[schemas.request.Request]:
+    """
+    Retrieve requests. Only supervisors can list requests.
+    Pass the `X-Next-Cursor` header of a page as `cursor` to get the next one;
+    `skip` is ignored when a cursor is given.
+    `fields` (e.g. `id,title,status,amount,expected_date`) and `include`
+    (`user`, `comments`) narrow the columns and relationships that are read
+    and returned; `fields` alone returns no relationships.
+    Pages are served from request_list_cache until a write touches them.
+    """
+    try:
+        after_id = decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    try:
+        fields_, include_ = crud.crud_request.parse_fieldset(fields, include)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    key = request_page_key(
+        skip=skip, limit=limit, user_id=user_id, supervisor_id=supervisor_id, after_id=after_id,
+        fields=fields_, include=include_
+    )
+    page = request_list_cache.get(key)
+    if page is None:
+        if is_full_fieldset(fields_, include_):
+            requests = await async_crud_request.get_multi(
+                db=db, skip=skip, limit=limit, user_id=user_id, supervisor_id=supervisor_id,
+                after_id=after_id
+            )
+        else:
+            requests = await async_crud_request.get_sparse_multi(
+                db=db, fields=fields_, include=include_, skip=skip, limit=limit,
+                user_id=user_id, supervisor_id=supervisor_id, after_id=after_id
+            )
+        page = render_request_page(requests, limit, fields_, include_)
+        request_list_cache.set(key, page)
+    return request_page_response(page)
+
+
+@router.get("/{request_id}", response_model=schemas.request.Request)
+async def read_request(
+        *,
+        db: AsyncSession = Depends(deps.get_async_db),
+        request_id: int,
+        if_none_match: Optional[str] = Header(None),
+        current_user: schemas.user.User = Depends(deps.get_current_active_user),
+) -> schemas.request.Request:
+    """
+    Get request by ID.
+    Returns 304 without a body when `If-None-Match` holds the current `ETag`.
+    """
+    etag = await async_crud_request.get_etag(db=db, id=request_id)
+    if not etag:
+        raise HTTPException(status_code=404, detail="Request not found")
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    request = await async_crud_request.get(db=db, id=request_id)
+    if not request:
+        raise HTTPException(status_code=404, detail="Request not found")
+    return json_response(request_dict(request), headers={"ETag": etag})
+
+
+@router.put("/{request_id}/status", response_model=schemas.request.Request)
+async def change_status_request(
+        *,
+        db: AsyncSession = Depends(deps.get_async_db),
+        request_id: int,
+        request_in: schemas.request.RequestUpdate,
+        current_user: schemas.user.User = Depends(deps.has_role("supervisor")),
+) -> schemas.request.Request:
+    """
+    Change request status. Only supervisors can approve or reject requests.
+    A comment is required if:
+    - The request amount is greater than 500
+    - The status is "rechazado"
+    """
+    request = await async_crud_request.get(db=db, id=request_id)
+    if not request:
+        raise HTTPException(status_code=404, detail="Request not found")
+
+    error = crud.crud_request.status_change_error(request, request_in)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+
+    # The new comment is appended to the loaded collection, so no reload is needed
+    return await async_crud_request.change_status(
+        db=db,
+        db_obj=request,
+        obj_in=request_in,
+        user_id=current_user.id
+    )
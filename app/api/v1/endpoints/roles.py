@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app import crud, schemas
 from app.api import deps
+from app.core.roles import role_catalogue
 
 router = APIRouter()
 
@@ -12,6 +13,8 @@ def create_role(
     db: Session = Depends(deps.get_db),
     role_in: schemas.role.RoleCreate,
 ) -> schemas.role.Role:
+    # Writes are rare: check against a fresh catalogue, not one up to a TTL old
+    role_catalogue.load(db)
     role = crud.crud_role.get_role_by_name(db, name=role_in.name)
     if role:
         raise HTTPException(
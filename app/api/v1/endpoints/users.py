@@ -1,26 +1,33 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app import crud, schemas
 from app.api import deps
+from app.core import security
+from app.schemas.serializers import json_response, user_dict
 
 router = APIRouter()
 
 @router.post("/", response_model=schemas.user.User)
-def create_user(
+async def create_user(
     *,
     db: Session = Depends(deps.get_db),
     user_in: schemas.user.UserCreate,
     current_user: schemas.user.User = Depends(deps.get_current_active_superuser),
 ) -> schemas.user.User:
-    user = crud.crud_user.get_user_by_email(db, email=user_in.email)
+    user = await run_in_threadpool(crud.crud_user.get_user_by_email, db, email=user_in.email)
     if user:
         raise HTTPException(
             status_code=400,
             detail="The user with this email already exists in the system.",
         )
-    user = crud.crud_user.create_user(db=db, user=user_in)
-    return user
+    hashed_password = await security.get_password_hash_async(user_in.password)
+    user = await run_in_threadpool(
+        crud.crud_user.create_user, db=db, user=user_in, hashed_password=hashed_password
+    )
+    # Serialize off the event loop; it may lazy-load roles
+    return await run_in_threadpool(schemas.user.User.model_validate, user)
 
 @router.get("/", response_model=List[schemas.user.User])
 def read_users(
@@ -30,7 +37,7 @@ def read_users(
     current_user: schemas.user.User = Depends(deps.get_current_active_user),
 ) -> List[schemas.user.User]:
     users = crud.crud_user.get_users(db, skip=skip, limit=limit)
-    return users
+    return json_response([user_dict(user) for user in users])
 
 @router.get("/{user_id}", response_model=schemas.user.User)
 def read_user(
@@ -44,18 +51,23 @@ def read_user(
     return user
 
 @router.put("/{user_id}", response_model=schemas.user.User)
-def update_user(
+async def update_user(
     *,
     db: Session = Depends(deps.get_db),
     user_id: int,
     user_in: schemas.user.UserUpdate,
     current_user: schemas.user.User = Depends(deps.get_current_active_superuser),
 ) -> schemas.user.User:
-    user = crud.crud_user.get_user(db, user_id=user_id)
+    user = await run_in_threadpool(crud.crud_user.get_user, db, user_id=user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    user = crud.crud_user.update_user(db=db, user_id=user_id, user=user_in)
-    return user
+    hashed_password = None
+    if user_in.password:
+        hashed_password = await security.get_password_hash_async(user_in.password)
+    user = await run_in_threadpool(
+        crud.crud_user.update_user, db=db, user_id=user_id, user=user_in, hashed_password=hashed_password
+    )
+    return await run_in_threadpool(schemas.user.User.model_validate, user)
 
 @router.delete("/{user_id}", response_model=dict)
 def delete_user(
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -9,9 +10,76 @@ class Settings(BaseSettings):
     SQL_SERVER: str = "MSI\\SQLEXPRESS"
     SQL_DATABASE: str = "WebApiPurchase"
     SQLALCHEMY_DATABASE_URI: str = f"mssql+pyodbc://{SQL_SERVER}/{SQL_DATABASE}?trusted_connection=yes&driver=ODBC+Driver+17+for+SQL+Server&TrustServerCertificate=yes"
+    # Connection pool, per engine and per worker process
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # Async database path: serves the hot routes with AsyncSession
+    DB_ASYNC: bool = False
+    ASYNC_SQLALCHEMY_DATABASE_URI: Optional[str] = None
     API_V1_STR: str = '/api/v1'
     PROJECT_NAME: str = 'WebApiPurchase'
     VERSION: str = '1.0.0'
     DESCRIPTION: str = "Web API for Purchase"
 
+    # Password hashing pool
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    # Caches
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+    # Serialized GET /requests pages; 0 disables the cache. The TTL bounds
+    # how stale a page can be in the other worker processes
+    REQUEST_LIST_CACHE_MAX_SIZE: int = 1000
+    REQUEST_LIST_CACHE_TTL_SECONDS: float = 5
+    # Role catalogue: reloaded after role writes, and by the other workers
+    # once it is this old
+    ROLE_CATALOGUE_TTL_SECONDS: float = 60
+
+    # Exports
+    CSV_EXPORT_CHUNK_SIZE: int = 1000
+
+    # Audit write-behind: audit rows are queued on commit and inserted in
+    # batches by a background thread. AUDIT_SPOOL_PATH keeps queued rows on
+    # disk until written (one file per worker process).
+    AUDIT_WRITE_BEHIND: bool = False
+    AUDIT_FLUSH_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    AUDIT_SPOOL_PATH: Optional[str] = None
+    AUDIT_SPOOL_FSYNC: bool = False
+
+    # Audit archival: rows older than the retention move to
+    # audit_requests_archive in batches, pausing between them
+    AUDIT_RETENTION_DAYS: int = 180
+    AUDIT_ARCHIVE_BATCH_SIZE: int = 1000
+    AUDIT_ARCHIVE_SLEEP_SECONDS: float = 0.5
+
+    # Bulk endpoints: items accepted per call and rows per INSERT batch
+    BULK_MAX_ITEMS: int = 5000
+    BULK_INSERT_BATCH_SIZE: int = 500
+
+    # SQL statements, DB time and rows fetched per request: Server-Timing header
+    # and per-route totals; requests over QUERY_COUNT_WARNING statements are logged
+    SERVER_TIMING_HEADER: bool = True
+    QUERY_COUNT_WARNING: int = 30
+
+    @property
+    def async_database_uri(self) -> str:
+        if self.ASYNC_SQLALCHEMY_DATABASE_URI:
+            return self.ASYNC_SQLALCHEMY_DATABASE_URI
+        uri = self.SQLALCHEMY_DATABASE_URI
+        for sync_driver, async_driver in (
+            ("mssql+pyodbc://", "mssql+aioodbc://"),
+            ("sqlite+pysqlite://", "sqlite+aiosqlite://"),
+            ("sqlite://", "sqlite+aiosqlite://"),
+        ):
+            if uri.startswith(sync_driver):
+                return async_driver + uri[len(sync_driver):]
+        return uri
+
 settings = Settings()
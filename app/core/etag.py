@@ -0,0 +1,32 @@
+from datetime import datetime
+from typing import Optional
+
+
+def make_etag(*parts: object) -> str:
+    """
+    Weak entity tag from the version markers of a resource.
+    """
+    return 'W/"' + "-".join("" if part is None else str(part) for part in parts) + '"'
+
+
+def version_etag(id: int, updated_at: datetime, last_comment_id: Optional[int], last_audit_id: Optional[int]) -> str:
+    return make_etag(id, updated_at.strftime("%Y%m%d%H%M%S%f"), last_comment_id, last_audit_id)
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of `etag` against an If-None-Match / If-Match header,
+    which may list several tags or be "*".
+    """
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
@@ -0,0 +1,156 @@
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Tuple
+
+# Request latency buckets in seconds, upper bounds of a Prometheus histogram
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"}
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Histogram:
+    __slots__ = ("buckets", "sum", "count")
+
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+class RequestMetrics:
+    """
+    Per-route request counters and latency histograms, plus the requests in
+    flight. Routes are labelled by template, so the number of series is
+    bounded by the routes of the app and the status codes they return.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._requests: Dict[Tuple[str, str, str], int] = {}
+        self._latency: Dict[Tuple[str, str], _Histogram] = {}
+        self.in_flight = 0
+
+    def started(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self, method: str, route: str, status: int, seconds: float) -> None:
+        if method not in METHODS:
+            method = "OTHER"
+        with self._lock:
+            self.in_flight -= 1
+            key = (method, route, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+            histogram = self._latency.get((method, route))
+            if histogram is None:
+                histogram = self._latency[(method, route)] = _Histogram()
+            histogram.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            histogram.sum += seconds
+            histogram.count += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            requests = sorted(self._requests.items())
+            latency = sorted(
+                (key, list(h.buckets), h.sum, h.count) for key, h in self._latency.items()
+            )
+            in_flight = self.in_flight
+
+        lines = _header("http_requests_total", "counter", "HTTP requests by route template and status.")
+        for (method, route, status), count in requests:
+            lines.append(_sample("http_requests_total", {"method": method, "route": route, "status": status}, count))
+
+        lines += _header("http_request_duration_seconds", "histogram", "HTTP request latency by route template.")
+        for (method, route), buckets, total, count in latency:
+            labels = {"method": method, "route": route}
+            cumulative = 0
+            for bound, observed in zip(LATENCY_BUCKETS + (float("inf"),), buckets):
+                cumulative += observed
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(_sample("http_request_duration_seconds_bucket", dict(labels, le=le), cumulative))
+            lines.append(_sample("http_request_duration_seconds_sum", labels, total))
+            lines.append(_sample("http_request_duration_seconds_count", labels, count))
+
+        lines += _header("http_requests_in_flight", "gauge", "HTTP requests being served.")
+        lines.append(_sample("http_requests_in_flight", {}, in_flight))
+        return lines
+
+
+request_metrics = RequestMetrics()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _sample(name: str, labels: Dict[str, str], value: Any) -> str:
+    if labels:
+        label_text = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+        return f"{name}{{{label_text}}} {value}"
+    return f"{name} {value}"
+
+
+def _header(name: str, kind: str, help_text: str) -> List[str]:
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+
+
+def _pool_lines(pools: Dict[str, Dict[str, Any]]) -> List[str]:
+    metrics = (
+        ("db_pool_size", "gauge", "pool_size", "Connections kept in the pool."),
+        ("db_pool_checked_out", "gauge", "checked_out", "Connections in use."),
+        ("db_pool_overflow", "gauge", "overflow_in_use", "Overflow connections in use."),
+        ("db_pool_max_overflow", "gauge", "max_overflow", "Overflow connections allowed."),
+        ("db_pool_checkouts_total", "counter", "checkouts", "Connections handed out."),
+        ("db_pool_timeouts_total", "counter", "timeouts", "Checkouts that gave up waiting."),
+        ("db_pool_wait_seconds_total", "counter", "wait_seconds_total", "Time spent waiting for a connection."),
+    )
+    lines: List[str] = []
+    for name, kind, field, help_text in metrics:
+        samples = [
+            _sample(name, {"engine": engine}, stats[field])
+            for engine, stats in pools.items() if field in stats
+        ]
+        if samples:
+            lines += _header(name, kind, help_text) + samples
+    return lines
+
+
+def _cache_lines(caches: Dict[str, Dict[str, Any]]) -> List[str]:
+    metrics = (
+        ("cache_hits_total", "counter", "hits", "Cache lookups that found an entry."),
+        ("cache_misses_total", "counter", "misses", "Cache lookups that found nothing."),
+        ("cache_entries", "gauge", "size", "Entries held by the cache."),
+    )
+    lines: List[str] = []
+    for name, kind, field, help_text in metrics:
+        lines += _header(name, kind, help_text)
+        lines += [_sample(name, {"cache": cache}, stats[field]) for cache, stats in caches.items()]
+    return lines
+
+
+def _threadpool_lines() -> List[str]:
+    """
+    Occupancy of the worker threads that run sync endpoints and
+    dependencies. Must be called from the event loop.
+    """
+    from anyio import to_thread
+
+    limiter = to_thread.current_default_thread_limiter()
+    statistics = limiter.statistics()
+    return (
+        _header("threadpool_threads", "gauge", "Worker threads available to sync endpoints.")
+        + [_sample("threadpool_threads", {}, int(limiter.total_tokens))]
+        + _header("threadpool_threads_busy", "gauge", "Worker threads running sync endpoints.")
+        + [_sample("threadpool_threads_busy", {}, statistics.borrowed_tokens)]
+        + _header("threadpool_tasks_waiting", "gauge", "Sync calls waiting for a worker thread.")
+        + [_sample("threadpool_tasks_waiting", {}, statistics.tasks_waiting)]
+    )
+
+
+def render_metrics(pools: Dict[str, Dict[str, Any]], caches: Dict[str, Dict[str, Any]]) -> str:
+    """Prometheus text exposition of the request, pool, cache and thread metrics."""
+    sections: Iterable[List[str]] = (
+        request_metrics.render(), _pool_lines(pools), _cache_lines(caches), _threadpool_lines()
+    )
+    return "\n".join(line for section in sections for line in section) + "\n"
@@ -0,0 +1,34 @@
+import base64
+import json
+from typing import Optional
+
+# requests.id is an INT column on SQL Server
+MAX_ID = 2 ** 31 - 1
+
+
+def encode_cursor(last_id: int) -> str:
+    """
+    Build an opaque keyset cursor pointing just after `last_id`.
+    """
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    """
+    Return the last seen id stored in `cursor`.
+    Raises ValueError if the cursor is malformed or its id is not an
+    integer in the range of requests.id.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        last_id = data["id"]
+    except (ValueError, KeyError, TypeError, OverflowError, RecursionError):
+        raise ValueError("Invalid cursor")
+    # Floats such as 1e999 (inf), bools and strings are not ids
+    if type(last_id) is not int or not 0 <= last_id <= MAX_ID:
+        raise ValueError("Invalid cursor")
+    return last_id
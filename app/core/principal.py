@@ -0,0 +1,42 @@
+from dataclasses import dataclass
+from typing import FrozenSet
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.roles import role_catalogue
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    What authorization needs to know about the authenticated user,
+    small enough to cache between requests.
+    """
+    id: int
+    is_active: bool
+    full_name: str
+    role_ids: FrozenSet[int]
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(
+            id=user.id,
+            is_active=bool(user.is_active),
+            full_name=user.full_name,
+            role_ids=frozenset(role.id for role in user.roles),
+        )
+
+    def has_role(self, role_name: str) -> bool:
+        # Role ids are stable, so renaming a role needs no cache invalidation
+        role = role_catalogue.by_name(role_name)
+        return role is not None and role.id in self.role_ids
+
+
+# Keyed by user id. Per process: other workers see changes after the TTL.
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_principal(user_id: int) -> None:
+    principal_cache.invalidate(user_id)
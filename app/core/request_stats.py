@@ -0,0 +1,199 @@
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+from app.core.metrics import request_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCounter:
+    """Database work done on behalf of one HTTP request."""
+
+    __slots__ = ("statements", "db_seconds", "rows")
+
+    def __init__(self) -> None:
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.rows = 0
+
+
+# Set by RequestStatsMiddleware for the duration of each request. Sync
+# endpoints run in a worker thread with a copy of the context, so they see
+# (and update) the same QueryCounter.
+current_queries: ContextVar[Optional[QueryCounter]] = ContextVar("current_queries", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    counter = current_queries.get()
+    if counter is not None:
+        counter.statements += 1
+        counter.db_seconds += time.perf_counter() - context._query_started
+        # The result is built from context.cursor right after this event
+        if cursor.description is not None and context is not None:
+            context.cursor = RowCountingCursor(cursor, counter)
+
+
+class RowCountingCursor:
+    """
+    DBAPI cursor wrapper that adds the rows fetched through it to a
+    QueryCounter, whether they end up in ORM objects or in Core rows.
+    Everything else is delegated to the wrapped cursor.
+    """
+
+    __slots__ = ("_cursor", "_counter")
+
+    def __init__(self, cursor: Any, counter: QueryCounter) -> None:
+        object.__setattr__(self, "_cursor", cursor)
+        object.__setattr__(self, "_counter", counter)
+
+    def fetchone(self) -> Any:
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._counter.rows += 1
+        return row
+
+    def fetchmany(self, *args: Any) -> List[Any]:
+        rows = self._cursor.fetchmany(*args)
+        self._counter.rows += len(rows)
+        return rows
+
+    def fetchall(self) -> List[Any]:
+        rows = self._cursor.fetchall()
+        self._counter.rows += len(rows)
+        return rows
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._cursor, name, value)
+
+
+def instrument_engine(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class RouteStats:
+    """Per-route totals of request duration and database work."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._routes: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, route: str, seconds: float, counter: QueryCounter) -> None:
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = {
+                    "requests": 0,
+                    "seconds_total": 0.0,
+                    "statements_total": 0,
+                    "statements_max": 0,
+                    "db_seconds_total": 0.0,
+                    "db_seconds_max": 0.0,
+                    "rows_total": 0,
+                }
+            stats["requests"] += 1
+            stats["seconds_total"] += seconds
+            stats["statements_total"] += counter.statements
+            stats["statements_max"] = max(stats["statements_max"], counter.statements)
+            stats["db_seconds_total"] += counter.db_seconds
+            stats["db_seconds_max"] = max(stats["db_seconds_max"], counter.db_seconds)
+            stats["rows_total"] += counter.rows
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Routes sorted by total database time, busiest first."""
+        with self._lock:
+            routes = [dict(stats, route=route) for route, stats in self._routes.items()]
+        for stats in routes:
+            requests = stats["requests"]
+            stats["statements_avg"] = stats["statements_total"] / requests
+            stats["db_seconds_avg"] = stats["db_seconds_total"] / requests
+            stats["rows_avg"] = stats["rows_total"] / requests
+        return sorted(routes, key=lambda stats: stats["db_seconds_total"], reverse=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+route_stats = RouteStats()
+
+
+def route_template(scope: Dict[str, Any]) -> str:
+    """
+    Path template of the matched route, so that aggregates stay bounded by
+    the number of routes rather than by URLs.
+    """
+    route = scope.get("route")
+    path = getattr(route, "path_format", None) or getattr(route, "path", None)
+    return path or "<unmatched>"
+
+
+def route_name(scope: Dict[str, Any]) -> str:
+    return f"{scope['method']} {route_template(scope)}"
+
+
+def server_timing(counter: QueryCounter, seconds: float) -> str:
+    return (
+        f'db;dur={counter.db_seconds * 1000:.2f};desc="{counter.statements} statements, '
+        f'{counter.rows} rows", app;dur={seconds * 1000:.2f}'
+    )
+
+
+class RequestStatsMiddleware:
+    """
+    Pure ASGI middleware that attributes the statements, database time and
+    rows fetched of each request to its route, and reports them in a
+    Server-Timing response header. Also feeds the /metrics request counters
+    and latency histograms.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        counter = QueryCounter()
+        token = current_queries.set(counter)
+        started = time.perf_counter()
+        status = 500
+        request_metrics.started()
+
+        async def send_with_timing(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            if message["type"] == "http.response.start" and settings.SERVER_TIMING_HEADER:
+                header = server_timing(counter, time.perf_counter() - started)
+                message = dict(message, headers=[
+                    *message.get("headers", []), (b"server-timing", header.encode("latin-1"))
+                ])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_queries.reset(token)
+            seconds = time.perf_counter() - started
+            route = route_name(scope)
+            route_stats.record(route, seconds, counter)
+            request_metrics.finished(scope["method"], route_template(scope), status, seconds)
+            if counter.statements > settings.QUERY_COUNT_WARNING:
+                logger.warning(
+                    "%s issued %d SQL statements (%.1f ms)",
+                    route, counter.statements, counter.db_seconds * 1000,
+                )
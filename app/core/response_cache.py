@@ -0,0 +1,101 @@
+import threading
+from typing import Any, Dict, Hashable, Iterable, Optional, Set, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session, SessionTransaction
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+# Key in Session.info holding the version scopes written by the current transaction
+PENDING_BUMPS = "pending_list_cache_bumps"
+GLOBAL = "global"
+
+
+class VersionedResponseCache:
+    """
+    Serialized responses keyed by their normalized query plus version
+    counters. A write bumps the counters of the scopes it touches (the
+    unfiltered listing and e.g. the owner's listings), so cached pages of
+    those scopes are never served again and simply age out of the LRU.
+    `epoch` is part of every key and invalidates everything at once.
+
+    Per process: other workers only see a write once the TTL expires.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._versions: Dict[Hashable, int] = {}
+        self.epoch = 0
+
+    def key(self, query: Tuple[Any, ...], scopes: Iterable[Hashable]) -> Tuple[Any, ...]:
+        """Cache key of `query`, whose result depends on `scopes`."""
+        with self._lock:
+            versions = tuple((scope, self._versions.get(scope, 0)) for scope in scopes)
+            return (self.epoch, query, versions)
+
+    def get(self, key: Tuple[Any, ...]) -> Any:
+        return self._cache.get(key)
+
+    def set(self, key: Tuple[Any, ...], value: Any) -> None:
+        self._cache.set(key, value)
+
+    def bump(self, scopes: Iterable[Hashable]) -> None:
+        with self._lock:
+            for scope in scopes:
+                self._versions[scope] = self._versions.get(scope, 0) + 1
+
+    def bump_all(self) -> None:
+        with self._lock:
+            self.epoch += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self._cache.stats(), epoch=self.epoch)
+
+
+# GET /requests pages, as (JSON body, next cursor)
+request_list_cache = VersionedResponseCache(
+    maxsize=settings.REQUEST_LIST_CACHE_MAX_SIZE,
+    ttl=settings.REQUEST_LIST_CACHE_TTL_SECONDS,
+)
+
+
+def request_list_scopes(user_id: Optional[int], supervisor_id: Optional[int]) -> Tuple[Hashable, ...]:
+    """Version scopes a request listing with these filters depends on."""
+    scopes: Tuple[Hashable, ...] = ()
+    if user_id is not None:
+        scopes += (("user", user_id),)
+    if supervisor_id is not None:
+        scopes += (("supervisor", supervisor_id),)
+    return scopes or (GLOBAL,)
+
+
+def invalidate_request_lists(
+    db: Session, *, user_ids: Iterable[int] = (), supervisor_ids: Iterable[Optional[int]] = ()
+) -> None:
+    """
+    Mark the listings of these owners and supervisors, and the unfiltered
+    listing, as changed once `db` commits. Bumping only after the commit
+    keeps a concurrent read from caching pre-commit rows under the new
+    version.
+    """
+    pending: Set[Hashable] = db.info.setdefault(PENDING_BUMPS, set())
+    pending.add(GLOBAL)
+    pending.update(("user", user_id) for user_id in user_ids)
+    pending.update(
+        ("supervisor", supervisor_id) for supervisor_id in supervisor_ids if supervisor_id is not None
+    )
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_pending_versions(session: Session) -> None:
+    scopes = session.info.pop(PENDING_BUMPS, None)
+    if scopes:
+        request_list_cache.bump(scopes)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending_versions(session: Session, transaction: SessionTransaction) -> None:
+    # Only the outermost transaction: a savepoint rollback keeps the bumps
+    # of the transaction around it, and a commit has already applied them
+    if transaction.parent is None:
+        session.info.pop(PENDING_BUMPS, None)
@@ -0,0 +1,59 @@
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.role import Role
+
+
+@dataclass(frozen=True)
+class RoleRecord:
+    id: int
+    name: str
+    description: Optional[str]
+
+
+class RoleCatalogue:
+    """
+    Process-wide copy of the roles table, by id and by name. Reloaded on
+    startup, after role writes in this process, and at most every `ttl`
+    seconds when a principal is loaded, which is how other workers see
+    role writes. Readers never lock: load() swaps both maps at once.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._maps: Tuple[Dict[int, RoleRecord], Dict[str, RoleRecord]] = ({}, {})
+        self._loaded_at: Optional[float] = None
+
+    def load(self, db: Session) -> None:
+        records = [
+            RoleRecord(id=row.id, name=row.name, description=row.description)
+            for row in db.execute(select(Role.id, Role.name, Role.description).order_by(Role.id))
+        ]
+        self._maps = ({r.id: r for r in records}, {r.name: r for r in records})
+        self._loaded_at = time.monotonic()
+
+    def refresh_if_stale(self, db: Session) -> None:
+        if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl:
+            self.load(db)
+
+    def get(self, role_id: int) -> Optional[RoleRecord]:
+        return self._maps[0].get(role_id)
+
+    def by_name(self, name: str) -> Optional[RoleRecord]:
+        return self._maps[1].get(name)
+
+    def all(self) -> List[RoleRecord]:
+        """Roles ordered by id."""
+        return list(self._maps[0].values())
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "roles": len(self._maps[0]),
+            "age_seconds": None if self._loaded_at is None else time.monotonic() - self._loaded_at,
+        }
+
+
+role_catalogue = RoleCatalogue(ttl=settings.ROLE_CATALOGUE_TTL_SECONDS)
@@ -1,8 +1,16 @@
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, Callable, Dict, Optional, Union
 from jose import jwt
 from passlib.context import CryptContext
+from pydantic import ValidationError
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.schemas.token import TokenPayload
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -10,6 +18,12 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 360
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
+# Verified tokens keyed by digest; each entry lives until the token's exp
+token_cache = TTLCache(
+    maxsize=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+
 def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -36,9 +50,109 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
-def verify_token(token: str) -> dict:
+class PasswordHasherBusy(Exception):
+    """Too many password hashes are already queued on the hashing pool."""
+
+
+# bcrypt runs on its own process pool so login bursts neither hold the GIL
+# nor tie up the threads that serve every other endpoint
+_hash_executor: Optional[ProcessPoolExecutor] = None
+_hash_pending = 0
+password_hash_stats: Dict[str, float] = {
+    "completed": 0,
+    "rejected": 0,
+    "pool_restarts": 0,
+    "total_seconds": 0.0,
+    "max_seconds": 0.0,
+}
+
+def _get_hash_executor() -> ProcessPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+    return _hash_executor
+
+def _discard_hash_executor(executor: ProcessPoolExecutor) -> None:
+    """
+    Drop a pool that lost a worker (OOM, kill); it would fail every call
+    from then on. Only the first caller to see `executor` break replaces it.
+    """
+    global _hash_executor
+    if _hash_executor is executor:
+        _hash_executor = None
+        password_hash_stats["pool_restarts"] += 1
+        executor.shutdown(wait=False)
+
+async def _run_on_hash_pool(fn: Callable[..., Any], *args: Any) -> Any:
+    global _hash_pending
+    if _hash_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        password_hash_stats["rejected"] += 1
+        raise PasswordHasherBusy()
+    _hash_pending += 1
+    start = time.perf_counter()
     try:
-        decoded_token = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-        return decoded_token
-    except jwt.JWTError:
-        return None 
\ No newline at end of file
+        loop = asyncio.get_running_loop()
+        executor = _get_hash_executor()
+        try:
+            result = await loop.run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            # Retry once on a fresh pool
+            _discard_hash_executor(executor)
+            result = await loop.run_in_executor(_get_hash_executor(), fn, *args)
+    finally:
+        _hash_pending -= 1
+    # Only successful hashes count towards the timings
+    elapsed = time.perf_counter() - start
+    password_hash_stats["completed"] += 1
+    password_hash_stats["total_seconds"] += elapsed
+    password_hash_stats["max_seconds"] = max(password_hash_stats["max_seconds"], elapsed)
+    return result
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_on_hash_pool(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_on_hash_pool(get_password_hash, password)
+
+def get_password_hash_stats() -> Dict[str, float]:
+    completed = password_hash_stats["completed"]
+    return {
+        **password_hash_stats,
+        "pending": _hash_pending,
+        "max_pending": settings.PASSWORD_HASH_MAX_PENDING,
+        "workers": settings.PASSWORD_HASH_WORKERS,
+        "avg_seconds": password_hash_stats["total_seconds"] / completed if completed else 0.0,
+    }
+
+def shutdown_password_hasher() -> None:
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=True)
+        _hash_executor = None
+
+def decode_token(token: str) -> Optional[TokenPayload]:
+    """
+    Verify `token` and return its payload, or None if it is invalid.
+    Verified tokens are cached until they expire, so repeated calls with the
+    same bearer token skip signature verification.
+    """
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
+    try:
+        claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+        payload = TokenPayload(**claims)
+    except (jwt.JWTError, ValidationError):
+        return None
+    if payload.exp:
+        ttl = payload.exp - time.time()
+        if ttl > 0:
+            token_cache.set(key, payload, ttl=ttl)
+    return payload
+
+def verify_token(token: str) -> dict:
+    payload = decode_token(token)
+    if payload is None:
+        return None
+    return payload.model_dump() 
\ No newline at end of file
@@ -0,0 +1,92 @@
+from typing import Any, Callable, List, Optional, Sequence
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.interfaces import LoaderOption
+from app.core.etag import version_etag
+from app.crud import crud_request
+from app.crud.base import unit_of_work
+from app.crud.crud_request import DETAIL_LOAD_OPTIONS, LIST_LOAD_OPTIONS
+from app.models.request import Request
+from app.schemas.request import RequestCreate, RequestUpdate
+
+# Reads are issued directly on the AsyncSession. Writes reuse the sync CRUD
+# through run_sync, so both paths keep the same stats/audit bookkeeping.
+
+
+def _in_unit_of_work(db: Session, fn: Callable[..., Any], **kwargs: Any) -> Any:
+    with unit_of_work(db):
+        return fn(db, **kwargs)
+
+
+async def get(
+        db: AsyncSession,
+        id: int,
+        options: Sequence[LoaderOption] = DETAIL_LOAD_OPTIONS,
+        populate_existing: bool = False
+) -> Optional[Request]:
+    statement = select(Request).options(*options).where(Request.id == id)
+    if populate_existing:
+        statement = statement.execution_options(populate_existing=True)
+    result = await db.execute(statement)
+    return result.scalars().first()
+
+
+async def get_etag(db: AsyncSession, id: int) -> Optional[str]:
+    result = await db.execute(crud_request.version_statement(id))
+    row = result.first()
+    return version_etag(*row) if row else None
+
+
+async def get_multi(
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        user_id: Optional[int] = None,
+        supervisor_id: Optional[int] = None,
+        after_id: Optional[int] = None,
+        options: Sequence[LoaderOption] = LIST_LOAD_OPTIONS
+) -> List[Request]:
+    statement = crud_request.list_statement(
+        skip=skip, limit=limit, user_id=user_id, supervisor_id=supervisor_id,
+        after_id=after_id, options=options
+    )
+    result = await db.execute(statement)
+    return result.scalars().all()
+
+
+async def get_sparse_multi(
+        db: AsyncSession,
+        *,
+        fields: Sequence[str],
+        include: Sequence[str],
+        skip: int = 0,
+        limit: int = 100,
+        user_id: Optional[int] = None,
+        supervisor_id: Optional[int] = None,
+        after_id: Optional[int] = None
+) -> List[Any]:
+    result = await db.execute(crud_request.sparse_list_statement(
+        fields=fields, include=include, skip=skip, limit=limit, user_id=user_id,
+        supervisor_id=supervisor_id, after_id=after_id
+    ))
+    return result.scalars().all() if include else result.all()
+
+
+async def create_with_audit(
+        db: AsyncSession, *, obj_in: RequestCreate, user_id: int, supervisor_id: Optional[int] = None
+) -> Request:
+    return await db.run_sync(
+        _in_unit_of_work, crud_request.create_with_audit,
+        obj_in=obj_in, user_id=user_id, supervisor_id=supervisor_id
+    )
+
+
+async def change_status(
+        db: AsyncSession, *, db_obj: Request, obj_in: RequestUpdate, user_id: int
+) -> Request:
+    return await db.run_sync(
+        _in_unit_of_work, crud_request.change_status,
+        db_obj=db_obj, obj_in=obj_in, user_id=user_id
+    )
@@ -0,0 +1,17 @@
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.models.user import User
+
+async def get_user(db: AsyncSession, user_id: int) -> Optional[User]:
+    result = await db.execute(
+        select(User).options(selectinload(User.roles)).where(User.id == user_id)
+    )
+    return result.scalars().first()
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
+    result = await db.execute(
+        select(User).options(selectinload(User.roles)).where(User.email == email)
+    )
+    return result.scalars().first()
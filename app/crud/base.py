@@ -1,4 +1,5 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from contextlib import contextmanager
+from typing import Any, Dict, Generic, Iterator, List, Optional, Type, TypeVar, Union
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
@@ -9,6 +10,49 @@ ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+UNIT_OF_WORK = "unit_of_work"
+
+
+def in_unit_of_work(db: Session) -> bool:
+    return db.info.get(UNIT_OF_WORK, 0) > 0
+
+
+@contextmanager
+def unit_of_work(db: Session) -> Iterator[Session]:
+    """
+    Run the CRUD writes inside the block as one transaction. Helpers leave
+    their changes pending and the block commits once on exit (rolling back on
+    error). Objects are not expired by that commit, so the response can be
+    built without reloading them.
+    """
+    if in_unit_of_work(db):
+        yield db
+        return
+    db.info[UNIT_OF_WORK] = 1
+    expire_on_commit = db.expire_on_commit
+    db.expire_on_commit = False
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.expire_on_commit = expire_on_commit
+        db.info.pop(UNIT_OF_WORK, None)
+
+
+def save(db: Session, *objs: Any) -> None:
+    """
+    Commit and refresh `objs`, unless a unit of work is open: then the
+    changes stay pending until it commits.
+    """
+    if in_unit_of_work(db):
+        return
+    db.commit()
+    for obj in objs:
+        db.refresh(obj)
+
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
         """
@@ -31,8 +75,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         obj_in_data = jsonable_encoder(obj_in)
         db_obj = self.model(**obj_in_data)  # type: ignore
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        save(db, db_obj)
         return db_obj
 
     def update(
@@ -51,12 +94,11 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             if field in update_data:
                 setattr(db_obj, field, update_data[field])
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        save(db, db_obj)
         return db_obj
 
     def remove(self, db: Session, *, id: int) -> ModelType:
         obj = db.query(self.model).get(id)
         db.delete(obj)
-        db.commit()
+        save(db)
         return obj 
\ No newline at end of file
@@ -1,7 +1,13 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from datetime import datetime
+import time
+from typing import Any, Dict, List, Optional, Type, Union
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Query, Session, selectinload
+from app.core.config import settings
 from app.crud.base import CRUDBase
-from app.models.audit import AuditRequest
+from app.db.audit_writer import queue_audits
+from app.models.audit import AuditRequest, AuditRequestArchive
+from app.models.user import User
 from app.schemas.audit import AuditRequestBase
 
 class CRUDAudit(CRUDBase[AuditRequest, AuditRequestBase, AuditRequestBase]):
@@ -12,13 +18,149 @@ class CRUDAudit(CRUDBase[AuditRequest, AuditRequestBase, AuditRequestBase]):
         skip: int = 0,
         limit: int = 100,
         request_id: Optional[int] = None,
-        user_id: Optional[int] = None
-    ) -> List[AuditRequest]:
-        query = db.query(self.model).join(self.model.user)
+        user_id: Optional[int] = None,
+        created_from: Optional[datetime] = None,
+        created_before: Optional[datetime] = None
+    ) -> List[Union[AuditRequest, AuditRequestArchive]]:
+        """
+        Newest audit entries first. Archived rows are all older than the hot
+        ones, so audit_requests_archive is only read when the page runs past
+        the end of audit_requests and `created_from` reaches the archive.
+        """
+        filters = dict(
+            request_id=request_id, user_id=user_id,
+            created_from=created_from, created_before=created_before
+        )
+        hot = self._query(db, AuditRequest, **filters).offset(skip).limit(limit).all()
+        if len(hot) >= limit or not _reaches_archive(db, created_from):
+            return hot
+
+        if hot:
+            archive_skip = 0
+        else:
+            hot_total = self._query(db, AuditRequest, **filters).order_by(None).count()
+            archive_skip = max(0, skip - hot_total)
+        cold = (
+            self._query(db, AuditRequestArchive, **filters)
+            .offset(archive_skip)
+            .limit(limit - len(hot))
+            .all()
+        )
+        return hot + cold
+
+    def _query(
+        self,
+        db: Session,
+        model: Type[Union[AuditRequest, AuditRequestArchive]],
+        *,
+        request_id: Optional[int],
+        user_id: Optional[int],
+        created_from: Optional[datetime],
+        created_before: Optional[datetime]
+    ) -> Query:
+        query = db.query(model).options(
+            selectinload(model.user).selectinload(User.roles)
+        )
         if request_id is not None:
-            query = query.filter(self.model.request_id == request_id)
+            query = query.filter(model.request_id == request_id)
         if user_id is not None:
-            query = query.filter(self.model.user_id == user_id)
-        return query.order_by(self.model.created_at.desc()).offset(skip).limit(limit).all()
+            query = query.filter(model.user_id == user_id)
+        if created_from is not None:
+            query = query.filter(model.created_at >= created_from)
+        if created_before is not None:
+            query = query.filter(model.created_at < created_before)
+        return query.order_by(model.created_at.desc(), model.id.desc())
+
+audit = CRUDAudit(AuditRequest)
+
+
+def create_audit(
+    db: Session,
+    *,
+    action: str,
+    request_id: int,
+    user_id: int,
+    new_status: Optional[str] = None,
+    previous_status: Optional[str] = None,
+    comment: Optional[str] = None,
+    created_at: Optional[datetime] = None
+) -> None:
+    """
+    Add an audit entry; it is written with the caller's commit, or queued
+    on it when settings.AUDIT_WRITE_BEHIND is enabled.
+    """
+    create_audits(db, [dict(
+        action=action,
+        previous_status=previous_status,
+        new_status=new_status,
+        comment=comment,
+        created_at=created_at or datetime.utcnow(),
+        request_id=request_id,
+        user_id=user_id
+    )])
+
+
+def create_audits(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """
+    Add many audit entries given as column dicts, in one executemany.
+    """
+    if not rows:
+        return
+    if settings.AUDIT_WRITE_BEHIND:
+        queue_audits(db, rows)
+    else:
+        db.execute(insert(AuditRequest), rows)
+
+
+def _reaches_archive(db: Session, created_from: Optional[datetime]) -> bool:
+    newest_archived = db.query(func.max(AuditRequestArchive.created_at)).scalar()
+    return newest_archived is not None and (created_from is None or created_from <= newest_archived)
+
+
+ARCHIVE_COLUMNS = [
+    "id", "action", "previous_status", "new_status", "comment",
+    "created_at", "request_id", "user_id",
+]
+
 
-audit = CRUDAudit(AuditRequest) 
\ No newline at end of file
+def archive(
+    db: Session,
+    *,
+    older_than: datetime,
+    batch_size: int = 1000,
+    sleep_seconds: float = 0.0
+) -> int:
+    """
+    Move audit rows created before `older_than` to audit_requests_archive,
+    oldest first, `batch_size` rows per transaction with a pause between
+    batches so the hot table is never locked for long. Returns the number
+    of rows moved.
+    """
+    moved = 0
+    while True:
+        ids = db.scalars(
+            select(AuditRequest.id)
+            .where(AuditRequest.created_at < older_than)
+            .order_by(AuditRequest.created_at, AuditRequest.id)
+            .limit(batch_size)
+        ).all()
+        if not ids:
+            return moved
+        db.execute(
+            insert(AuditRequestArchive).from_select(
+                ARCHIVE_COLUMNS,
+                select(*(getattr(AuditRequest, column) for column in ARCHIVE_COLUMNS))
+                .where(AuditRequest.id.in_(ids))
+            )
+        )
+        db.execute(
+            delete(AuditRequest)
+            .where(AuditRequest.id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        moved += len(ids)
+        if len(ids) < batch_size:
+            return moved
+        if sleep_seconds:
+            time.sleep(sleep_seconds)
@@ -1,38 +1,58 @@
-from typing import List, Optional, Union, Dict, Any
-from sqlalchemy.orm import Session
-from app.crud.base import CRUDBase
-from app.models.request import Request
-from app.schemas.request import RequestCreate, RequestUpdate
+from datetime import date, datetime
+from typing import List, Optional, Sequence, Tuple, Union, Dict, Any
+from sqlalchemy import Select, func, insert, select, update as sql_update
+from sqlalchemy.orm import Session, aliased, joinedload, load_only, selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+from app.crud import crud_audit, crud_user_stats
+from app.crud.base import CRUDBase, save
+from app.core.config import settings
+from app.core.etag import version_etag
+from app.core.response_cache import invalidate_request_lists
+from app.models.audit import AuditRequest
+from app.models.request import Request, CommentRequest
+from app.models.user import User
+from app.schemas.request import RequestCreate, RequestStatusBulk, RequestUpdate
+
+# Loader strategies for what schemas.request.Request serializes (user, user.roles,
+# comments). A list page costs one SELECT per relationship instead of one per row.
+LIST_LOAD_OPTIONS: Sequence[LoaderOption] = (
+    selectinload(Request.user).selectinload(User.roles),
+    selectinload(Request.comments),
+)
+DETAIL_LOAD_OPTIONS: Sequence[LoaderOption] = (
+    joinedload(Request.user).selectinload(User.roles),
+    selectinload(Request.comments),
+)
+
+# Columns of schemas.request.Request, in its field order, and the
+# relationships it nests; the sparse fieldsets of GET /requests pick from these
+REQUEST_FIELDS: Tuple[str, ...] = (
+    "title", "description", "status", "amount", "expected_date",
+    "id", "user_id", "supervisor_id", "created_at", "updated_at",
+)
+REQUEST_INCLUDES: Tuple[str, ...] = ("comments", "user")
 
 
 class CRUDRequest(CRUDBase[Request, RequestCreate, RequestUpdate]):
     def create_with_user(
             self, db: Session, *, obj_in: RequestCreate, user_id: int, supervisor_id: Optional[int] = None
     ) -> Request:
-        obj_in_data = obj_in.dict()
-        db_obj = self.model(**obj_in_data, user_id=user_id, supervisor_id=supervisor_id)
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+        return create_with_user(db, obj_in=obj_in, user_id=user_id, supervisor_id=supervisor_id)
 
-    def get(self, db: Session, id: int) -> Optional[Request]:
-        return db.query(self.model).filter(self.model.id == id).first()
+    def get(
+            self, db: Session, id: int, options: Sequence[LoaderOption] = DETAIL_LOAD_OPTIONS
+    ) -> Optional[Request]:
+        return db.query(self.model).options(*options).filter(self.model.id == id).first()
 
     def update(
         self, db: Session, *, db_obj: Request, obj_in: Union[RequestUpdate, Dict[str, Any]]
     ) -> Request:
-        if isinstance(obj_in, dict):
-            update_data = obj_in
-        else:
-            update_data = obj_in.dict(exclude_unset=True)
-        
-        for field in update_data:
-            setattr(db_obj, field, update_data[field])
-        
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        return update(db, db_obj=db_obj, obj_in=obj_in)
+
+    def remove(self, db: Session, *, id: int) -> Optional[Request]:
+        db_obj = get(db, id, options=())
+        if db_obj:
+            delete_request(db, id)
         return db_obj
 
     def get_multi(
@@ -42,21 +62,46 @@ class CRUDRequest(CRUDBase[Request, RequestCreate, RequestUpdate]):
             skip: int = 0,
             limit: int = 100,
             user_id: Optional[int] = None,
-            supervisor_id: Optional[int] = None
+            supervisor_id: Optional[int] = None,
+            after_id: Optional[int] = None,
+            options: Sequence[LoaderOption] = LIST_LOAD_OPTIONS
     ) -> List[Request]:
-        query = db.query(self.model).join(self.model.user)
-        if user_id is not None:
-            query = query.filter(self.model.user_id == user_id)
-        if supervisor_id is not None:
-            query = query.filter(self.model.supervisor_id == supervisor_id)
-        return query.order_by(self.model.id).offset(skip).limit(limit).all()
+        return get_multi(
+            db, skip=skip, limit=limit, user_id=user_id, supervisor_id=supervisor_id,
+            after_id=after_id, options=options
+        )
 
 
 request = CRUDRequest(Request)
 
 
-def get(db: Session, id: int) -> Optional[Request]:
-    return db.query(Request).filter(Request.id == id).first()
+def get(
+        db: Session, id: int, options: Sequence[LoaderOption] = DETAIL_LOAD_OPTIONS
+) -> Optional[Request]:
+    return db.query(Request).options(*options).filter(Request.id == id).first()
+
+
+def version_statement(id: int) -> Select:
+    """
+    Version markers of a request for its ETag: updated_at, the latest
+    comment id and the audit high-water mark. Index seeks only, no hydration.
+    """
+    last_comment = (
+        select(func.max(CommentRequest.id)).where(CommentRequest.request_id == id).scalar_subquery()
+    )
+    last_audit = (
+        select(func.max(AuditRequest.id)).where(AuditRequest.request_id == id).scalar_subquery()
+    )
+    return select(
+        Request.id, Request.updated_at,
+        last_comment.label("last_comment_id"), last_audit.label("last_audit_id"),
+    ).where(Request.id == id)
+
+
+def get_etag(db: Session, id: int) -> Optional[str]:
+    """Current ETag of request `id`, or None if it does not exist."""
+    row = db.execute(version_statement(id)).first()
+    return version_etag(*row) if row else None
 
 
 def update(
@@ -67,28 +112,146 @@ def update(
     else:
         update_data = obj_in.dict(exclude_unset=True)
 
+    previous_status, previous_amount = db_obj.status, db_obj.amount
+    previous_supervisor_id = db_obj.supervisor_id
     for field in update_data:
         setattr(db_obj, field, update_data[field])
+    invalidate_request_lists(
+        db, user_ids=[db_obj.user_id], supervisor_ids=[previous_supervisor_id, db_obj.supervisor_id]
+    )
 
+    crud_user_stats.record_status_change(
+        db, user_id=db_obj.user_id, previous_status=previous_status, new_status=db_obj.status
+    )
+    crud_user_stats.record_amount_change(
+        db, user_id=db_obj.user_id, previous_amount=previous_amount, new_amount=db_obj.amount
+    )
     db.add(db_obj)
-    db.commit()
-    db.refresh(db_obj)
+    save(db, db_obj)
     return db_obj
+
+
+def list_statement(
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        user_id: Optional[int] = None,
+        supervisor_id: Optional[int] = None,
+        after_id: Optional[int] = None,
+        options: Sequence[LoaderOption] = LIST_LOAD_OPTIONS
+) -> Select:
+    """
+    SELECT for a page of requests, shared by the sync and async CRUD.
+    """
+    return _page(
+        select(Request).options(*options), skip=skip, limit=limit, user_id=user_id,
+        supervisor_id=supervisor_id, after_id=after_id
+    )
+
+
+def _page(
+        statement: Select, *, skip: int, limit: int, user_id: Optional[int],
+        supervisor_id: Optional[int], after_id: Optional[int]
+) -> Select:
+    if user_id is not None:
+        statement = statement.where(Request.user_id == user_id)
+    if supervisor_id is not None:
+        statement = statement.where(Request.supervisor_id == supervisor_id)
+    # Keyset: seek past the last seen id instead of scanning skipped rows
+    if after_id is not None:
+        statement = statement.where(Request.id > after_id)
+        skip = 0
+    return statement.order_by(Request.id).offset(skip).limit(limit)
+
+
+def parse_fieldset(
+        fields: Optional[str], include: Optional[str]
+) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """
+    Normalize the comma-separated `fields` and `include` of a listing into
+    ordered tuples. Without either, everything is returned; `fields` alone
+    returns no relationships; `include` alone returns every column. `id` is
+    always kept, for the cursor. Raises ValueError on unknown names.
+    """
+    if fields is None and include is None:
+        return REQUEST_FIELDS, REQUEST_INCLUDES
+    wanted = set(REQUEST_FIELDS) if fields is None else {f.strip() for f in fields.split(",") if f.strip()}
+    included = {i.strip() for i in (include or "").split(",") if i.strip()}
+    unknown = (wanted - set(REQUEST_FIELDS)) | (included - set(REQUEST_INCLUDES))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    wanted.add("id")
+    return (
+        tuple(f for f in REQUEST_FIELDS if f in wanted),
+        tuple(i for i in REQUEST_INCLUDES if i in included),
+    )
+
+
+def sparse_list_statement(
+        *,
+        fields: Sequence[str],
+        include: Sequence[str],
+        skip: int = 0,
+        limit: int = 100,
+        user_id: Optional[int] = None,
+        supervisor_id: Optional[int] = None,
+        after_id: Optional[int] = None
+) -> Select:
+    """
+    Like list_statement, restricted to the `fields` columns and the
+    `include` relationships. Without relationships it selects plain columns
+    (rows, no ORM objects); otherwise Request entities with only those
+    columns loaded. Execute it with get_sparse_multi.
+    """
+    if include:
+        columns = set(fields) | ({"user_id"} if "user" in include else set())
+        options: List[LoaderOption] = [load_only(*(getattr(Request, name) for name in columns))]
+        if "user" in include:
+            options.append(selectinload(Request.user).selectinload(User.roles))
+        if "comments" in include:
+            options.append(selectinload(Request.comments))
+        statement = select(Request).options(*options)
+    else:
+        statement = select(*(getattr(Request, name) for name in fields))
+    return _page(
+        statement, skip=skip, limit=limit, user_id=user_id, supervisor_id=supervisor_id,
+        after_id=after_id
+    )
+
+
+def get_sparse_multi(
+        db: Session,
+        *,
+        fields: Sequence[str],
+        include: Sequence[str],
+        skip: int = 0,
+        limit: int = 100,
+        user_id: Optional[int] = None,
+        supervisor_id: Optional[int] = None,
+        after_id: Optional[int] = None
+) -> List[Any]:
+    result = db.execute(sparse_list_statement(
+        fields=fields, include=include, skip=skip, limit=limit, user_id=user_id,
+        supervisor_id=supervisor_id, after_id=after_id
+    ))
+    return result.scalars().all() if include else result.all()
+
+
 def get_multi(
-        # self,
         db: Session,
         *,
         skip: int = 0,
         limit: int = 100,
         user_id: Optional[int] = None,
-        supervisor_id: Optional[int] = None
+        supervisor_id: Optional[int] = None,
+        after_id: Optional[int] = None,
+        options: Sequence[LoaderOption] = LIST_LOAD_OPTIONS
 ) -> List[Request]:
-    query = db.query(Request)
-    if user_id is not None:
-        query = query.filter(Request.user_id == user_id)
-    if supervisor_id is not None:
-        query = query.filter(Request.supervisor_id == supervisor_id)
-    return query.order_by(Request.id).offset(skip).limit(limit).all()
+    statement = list_statement(
+        skip=skip, limit=limit, user_id=user_id, supervisor_id=supervisor_id,
+        after_id=after_id, options=options
+    )
+    return db.execute(statement).scalars().all()
 
 def create_with_user(
         db: Session, *, obj_in: RequestCreate, user_id: int, supervisor_id: Optional[int] = None
@@ -96,11 +259,302 @@ def create_with_user(
     obj_in_data = obj_in.dict()
     db_obj = Request(**obj_in_data, user_id=user_id, supervisor_id=supervisor_id)
     db.add(db_obj)
-    db.commit()
-    db.refresh(db_obj)
+    invalidate_request_lists(db, user_ids=[user_id], supervisor_ids=[supervisor_id])
+    crud_user_stats.record_created(
+        db, user_id=user_id, status=db_obj.status, amounts=[db_obj.amount]
+    )
+    save(db, db_obj)
+    return db_obj
+
+
+def add_comment(db: Session, *, db_obj: Request, comment: str, user_id: int) -> CommentRequest:
+    """
+    Add a comment to a request and bump its denormalized comment_count
+    in the same transaction.
+    """
+    db_comment = CommentRequest(comment=comment, user_id=user_id)
+    db_obj.comments.append(db_comment)
+    db_obj.comment_count = Request.comment_count + 1
+    save(db, db_comment)
+    return db_comment
+
+
+def create_with_audit(
+        db: Session, *, obj_in: RequestCreate, user_id: int, supervisor_id: Optional[int] = None
+) -> Request:
+    """
+    Create a request for `user_id` and record its "create" audit entry.
+    """
+    db_obj = create_with_user(db, obj_in=obj_in, user_id=user_id, supervisor_id=supervisor_id)
+    # The audit row needs the generated id
+    db.flush()
+    crud_audit.create_audit(
+        db,
+        action="create",
+        new_status=db_obj.status,
+        request_id=db_obj.id,
+        user_id=user_id
+    )
+    save(db)
     return db_obj
 
 
+def create_bulk(
+        db: Session, *, objs_in: List[RequestCreate], user_id: int, supervisor_id: Optional[int] = None
+) -> List[int]:
+    """
+    Insert many requests for `user_id` with their "create" audit rows, in
+    batches of `settings.BULK_INSERT_BATCH_SIZE`. Returns the new ids in
+    input order.
+
+    The requests go through INSERT ... RETURNING (SQLAlchemy's
+    insertmanyvalues, OUTPUT on SQL Server), not executemany: executemany
+    cannot hand back the generated ids, which the per-item results need.
+    Only the audit rows use the driver executemany (fast_executemany on
+    SQL Server). On SQLite the ordered RETURNING runs one INSERT per row.
+    """
+    now = datetime.utcnow()
+    ids: List[int] = []
+    for start in range(0, len(objs_in), settings.BULK_INSERT_BATCH_SIZE):
+        batch = objs_in[start:start + settings.BULK_INSERT_BATCH_SIZE]
+        rows = [
+            dict(
+                obj_in.dict(),
+                user_id=user_id,
+                supervisor_id=supervisor_id,
+                comment_count=0,
+                created_at=now,
+                updated_at=now,
+            )
+            for obj_in in batch
+        ]
+        batch_ids = db.scalars(
+            insert(Request).returning(Request.id, sort_by_parameter_order=True), rows
+        ).all()
+        crud_audit.create_audits(
+            db,
+            [
+                dict(
+                    action="create",
+                    new_status=row["status"],
+                    created_at=now,
+                    request_id=request_id,
+                    user_id=user_id,
+                )
+                for row, request_id in zip(rows, batch_ids)
+            ],
+        )
+        ids.extend(batch_ids)
+
+    amounts_by_status: Dict[str, List[float]] = {}
+    for obj_in in objs_in:
+        amounts_by_status.setdefault(obj_in.status, []).append(obj_in.amount)
+    for status, amounts in amounts_by_status.items():
+        crud_user_stats.record_created(db, user_id=user_id, status=status, amounts=amounts)
+    invalidate_request_lists(db, user_ids=[user_id], supervisor_ids=[supervisor_id])
+    save(db)
+    return ids
+
+
+def status_error(obj_in: Union[RequestUpdate, RequestStatusBulk]) -> Optional[str]:
+    """
+    Checks that do not depend on the request: the target status and the
+    comment required for rejections.
+    """
+    if obj_in.status not in ["aprobado", "rechazado"]:
+        return "Status must be either 'aprobado' or 'rechazado'"
+    if obj_in.status == "rechazado" and not obj_in.comment:
+        return "Comment is required"
+    return None
+
+
+def status_change_error(db_obj: Request, obj_in: RequestUpdate) -> Optional[str]:
+    """
+    Return why `obj_in` is not a valid status change for `db_obj`, or None.
+    A comment is required for rejections and for amounts greater than 500.
+    """
+    error = status_error(obj_in)
+    if error:
+        return error
+    if db_obj.amount > 500 and not obj_in.comment:
+        return "Comment is required for rejected requests or requests with amount greater than 500"
+    return None
+
+
+def change_status(
+        db: Session, *, db_obj: Request, obj_in: RequestUpdate, user_id: int
+) -> Request:
+    """
+    Apply an already validated status change: optional comment, audit entry
+    and the status update with its denormalized last-status fields.
+    """
+    if obj_in.comment:
+        add_comment(db, db_obj=db_obj, comment=obj_in.comment, user_id=user_id)
+
+    changed_at = datetime.utcnow()
+    crud_audit.create_audit(
+        db,
+        action="status_change",
+        previous_status=db_obj.status,
+        new_status=obj_in.status,
+        comment=obj_in.comment,
+        created_at=changed_at,
+        request_id=db_obj.id,
+        user_id=user_id
+    )
+
+    update_data = obj_in.dict(exclude_unset=True)
+    update_data.pop("comment", None)
+    update_data.update(
+        last_status_change=obj_in.status,
+        last_status_change_at=changed_at,
+        last_status_comment=obj_in.comment
+    )
+    return update(db, db_obj=db_obj, obj_in=update_data)
+
+
+def change_status_bulk(
+        db: Session, *, obj_in: RequestStatusBulk, user_id: int
+) -> Dict[int, Optional[str]]:
+    """
+    Apply one status change to many requests. The status itself must already
+    be valid (see status_error); requests that are missing or need a comment
+    are skipped. Targets are read and written in batches of
+    `settings.BULK_INSERT_BATCH_SIZE` ids. Returns the error per id, None for
+    the updated ones.
+    """
+    ids = list(dict.fromkeys(obj_in.ids))
+    errors: Dict[int, Optional[str]] = {}
+    changed_at = datetime.utcnow()
+    # (user_id, previous_status) -> number of requests, for user_request_stats
+    moved: Dict[Any, int] = {}
+    for start in range(0, len(ids), settings.BULK_INSERT_BATCH_SIZE):
+        batch = ids[start:start + settings.BULK_INSERT_BATCH_SIZE]
+        rows = {
+            row.id: row
+            for row in db.execute(
+                select(
+                    Request.id, Request.status, Request.amount, Request.user_id, Request.supervisor_id
+                )
+                .where(Request.id.in_(batch))
+            )
+        }
+        targets = []
+        for request_id in batch:
+            row = rows.get(request_id)
+            if row is None:
+                errors[request_id] = "Request not found"
+                continue
+            errors[request_id] = status_change_error(row, obj_in)
+            if errors[request_id] is None:
+                targets.append(row)
+        if not targets:
+            continue
+
+        values = dict(
+            status=obj_in.status,
+            last_status_change=obj_in.status,
+            last_status_change_at=changed_at,
+            last_status_comment=obj_in.comment,
+            updated_at=changed_at,
+        )
+        if obj_in.comment:
+            values["comment_count"] = Request.comment_count + 1
+        db.execute(
+            sql_update(Request)
+            .where(Request.id.in_([row.id for row in targets]))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        if obj_in.comment:
+            db.execute(
+                insert(CommentRequest),
+                [
+                    dict(comment=obj_in.comment, created_at=changed_at, request_id=row.id, user_id=user_id)
+                    for row in targets
+                ],
+            )
+        crud_audit.create_audits(
+            db,
+            [
+                dict(
+                    action="status_change",
+                    previous_status=row.status,
+                    new_status=obj_in.status,
+                    comment=obj_in.comment,
+                    created_at=changed_at,
+                    request_id=row.id,
+                    user_id=user_id,
+                )
+                for row in targets
+            ],
+        )
+        for row in targets:
+            key = (row.user_id, row.status)
+            moved[key] = moved.get(key, 0) + 1
+        invalidate_request_lists(
+            db,
+            user_ids={row.user_id for row in targets},
+            supervisor_ids={row.supervisor_id for row in targets},
+        )
+
+    for (owner_id, previous_status), count in moved.items():
+        crud_user_stats.record_status_change(
+            db, user_id=owner_id, previous_status=previous_status,
+            new_status=obj_in.status, count=count
+        )
+    save(db)
+    return errors
+
+
+def report_statement(
+        *,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        status: Optional[str] = None,
+        user_id: Optional[int] = None
+) -> Select:
+    """
+    Portable equivalent of sp_GetRequestReport, for databases without the
+    stored procedure. Same column labels, except the DATEDIFF columns, which
+    the caller derives from RequestCreatedAt and ExpectedDate.
+    """
+    creator = aliased(User)
+    supervisor = aliased(User)
+    statement = (
+        select(
+            Request.id.label("RequestId"),
+            Request.title.label("RequestTitle"),
+            Request.description.label("RequestDescription"),
+            Request.status.label("RequestStatus"),
+            Request.amount.label("RequestAmount"),
+            Request.expected_date.label("ExpectedDate"),
+            Request.created_at.label("RequestCreatedAt"),
+            Request.updated_at.label("RequestUpdatedAt"),
+            creator.email.label("RequestCreatorEmail"),
+            creator.full_name.label("RequestCreatorName"),
+            supervisor.email.label("SupervisorEmail"),
+            supervisor.full_name.label("SupervisorName"),
+            Request.last_status_change.label("LastStatusChange"),
+            Request.last_status_change_at.label("LastStatusChangeDate"),
+            Request.last_status_comment.label("LastStatusComment"),
+            Request.comment_count.label("CommentCount"),
+        )
+        .join(creator, Request.user_id == creator.id)
+        .outerjoin(supervisor, Request.supervisor_id == supervisor.id)
+        .order_by(Request.created_at.desc())
+    )
+    if start_date is not None:
+        statement = statement.where(Request.created_at >= datetime.combine(start_date, datetime.min.time()))
+    if end_date is not None:
+        statement = statement.where(Request.created_at <= datetime.combine(end_date, datetime.min.time()))
+    if status is not None:
+        statement = statement.where(Request.status == status)
+    if user_id is not None:
+        statement = statement.where(Request.user_id == user_id)
+    return statement
+
+
 def get_request(db: Session, request_id: int) -> Optional[Request]:
     return db.query(Request).filter(Request.id == request_id).first()
 
@@ -123,8 +577,8 @@ def get_requests(
 def create_request(db: Session, request: RequestCreate) -> Request:
     db_request = Request(**request.dict())
     db.add(db_request)
-    db.commit()
-    db.refresh(db_request)
+    invalidate_request_lists(db, user_ids=[db_request.user_id], supervisor_ids=[db_request.supervisor_id])
+    save(db, db_request)
     return db_request
 
 
@@ -135,11 +589,7 @@ def update_request(
 ) -> Optional[Request]:
     db_request = get_request(db, request_id)
     if db_request:
-        update_data = request.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_request, field, value)
-        db.commit()
-        db.refresh(db_request)
+        db_request = update(db, db_obj=db_request, obj_in=request)
     return db_request
 
 
@@ -147,6 +597,12 @@ def delete_request(db: Session, request_id: int) -> bool:
     db_request = get_request(db, request_id)
     if db_request:
         db.delete(db_request)
-        db.commit()
+        invalidate_request_lists(
+            db, user_ids=[db_request.user_id], supervisor_ids=[db_request.supervisor_id]
+        )
+        crud_user_stats.record_deleted(
+            db, user_id=db_request.user_id, status=db_request.status, amount=db_request.amount
+        )
+        save(db)
         return True
     return False
@@ -1,20 +1,19 @@
 from typing import List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
+from app.core.principal import principal_cache
+from app.core.response_cache import request_list_cache
+from app.core.roles import RoleRecord, role_catalogue
 from app.crud.base import CRUDBase
 from app.models.role import Role
+from app.models.user import User
 from app.schemas.role import RoleCreate, RoleUpdate
 
 class CRUDRole(CRUDBase[Role, RoleCreate, RoleUpdate]):
-    def get_role_by_name(self, db: Session, *, name: str) -> Optional[Role]:
-        return db.query(Role).filter(Role.name == name).first()
+    def get_role_by_name(self, db: Session, *, name: str) -> Optional[RoleRecord]:
+        return get_role_by_name(db, name=name)
 
     def create_with_user(self, db: Session, *, obj_in: RoleCreate) -> Role:
-        obj_in_data = obj_in.dict()
-        db_obj = self.model(**obj_in_data)
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+        return create_with_user(db, obj_in=obj_in)
 
 role = CRUDRole(Role)
 
@@ -25,14 +24,25 @@ def create_with_user(db: Session, *, obj_in: RoleCreate) -> Role:
     db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
+    role_catalogue.load(db)
     return db_obj
-def get_role_by_name(db: Session, *, name: str) -> Optional[Role]:
-    return db.query(Role).filter(Role.name == name).first()
+def get_role_by_name(db: Session, *, name: str) -> Optional[RoleRecord]:
+    """Served from the role catalogue; `db` is only used to load it."""
+    role_catalogue.refresh_if_stale(db)
+    return role_catalogue.by_name(name)
 def get_role(db: Session, role_id: int) -> Optional[Role]:
     return db.query(Role).filter(Role.id == role_id).first()
 
 def get_roles(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Role).order_by(Role.id).offset(skip).limit(limit).all()
+    # schemas.role.Role nests the users of each role, and their roles
+    return (
+        db.query(Role)
+        .options(selectinload(Role.users).selectinload(User.roles))
+        .order_by(Role.id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
 
 def create_role(db: Session, role: RoleCreate) -> Role:
     db_role = Role(
@@ -42,6 +52,7 @@ def create_role(db: Session, role: RoleCreate) -> Role:
     db.add(db_role)
     db.commit()
     db.refresh(db_role)
+    role_catalogue.load(db)
     return db_role
 
 def update_role(db: Session, role_id: int, role: RoleUpdate) -> Optional[Role]:
@@ -54,7 +65,10 @@ def update_role(db: Session, role_id: int, role: RoleUpdate) -> Optional[Role]:
         setattr(db_role, field, value)
     
     db.commit()
+    # Cached GET /requests pages embed the roles of each request's user
+    request_list_cache.bump_all()
     db.refresh(db_role)
+    role_catalogue.load(db)
     return db_role
 
 def delete_role(db: Session, role_id: int) -> bool:
@@ -63,4 +77,7 @@ def delete_role(db: Session, role_id: int) -> bool:
         return False
     db.delete(db_role)
     db.commit()
-    return True 
\ No newline at end of file
+    principal_cache.clear()
+    request_list_cache.bump_all()
+    role_catalogue.load(db)
+    return True
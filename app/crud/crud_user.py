@@ -1,7 +1,10 @@
 from typing import Optional, List
 from sqlalchemy.orm import Session, joinedload
 from app.models.user import User
+from app.models.user_request_stats import UserRequestStats
 from app.schemas.user import UserCreate, UserUpdate
+from app.core.principal import invalidate_principal
+from app.core.response_cache import request_list_cache
 from app.core.security import get_password_hash
 
 def get_user(db: Session, user_id: int) -> Optional[User]:
@@ -13,8 +16,9 @@ def get_user_by_email(db: Session, email: str) -> Optional[User]:
 def get_users(db: Session, skip: int = 0, limit: int = 100):
     return db.query(User).options(joinedload(User.roles)).order_by(User.id).offset(skip).limit(limit).all()
 
-def create_user(db: Session, user: UserCreate) -> User:
-    hashed_password = get_password_hash(user.password)
+def create_user(db: Session, user: UserCreate, hashed_password: Optional[str] = None) -> User:
+    if hashed_password is None:
+        hashed_password = get_password_hash(user.password)
     db_user = User(
         email=user.email,
         hashed_password=hashed_password,
@@ -28,18 +32,23 @@ def create_user(db: Session, user: UserCreate) -> User:
     db_user.roles = roles
     
     db.add(db_user)
+    # Fila de estadísticas a cero, para que crud_user_stats solo haga UPDATE
+    db.add(UserRequestStats(user=db_user))
     db.commit()
     db.refresh(db_user)
     return db_user
 
-def update_user(db: Session, user_id: int, user: UserUpdate) -> Optional[User]:
+def update_user(
+    db: Session, user_id: int, user: UserUpdate, hashed_password: Optional[str] = None
+) -> Optional[User]:
     db_user = get_user(db, user_id)
     if not db_user:
         return None
     
     update_data = user.model_dump(exclude_unset=True)
     if "password" in update_data:
-        update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+        password = update_data.pop("password")
+        update_data["hashed_password"] = hashed_password or get_password_hash(password)
     
     # Actualizar roles si se proporcionan
     if "role_ids" in update_data:
@@ -51,6 +60,8 @@ def update_user(db: Session, user_id: int, user: UserUpdate) -> Optional[User]:
         setattr(db_user, field, value)
     
     db.commit()
+    invalidate_principal(user_id)
+    request_list_cache.bump_all()
     db.refresh(db_user)
     return db_user
 
@@ -60,6 +71,8 @@ def delete_user(db: Session, user_id: int) -> bool:
         return False
     db.delete(db_user)
     db.commit()
+    invalidate_principal(user_id)
+    request_list_cache.bump_all()
     return True
 
 def add_role_to_user(db: Session, user_id: int, role_id: int) -> bool:
@@ -72,6 +85,8 @@ def add_role_to_user(db: Session, user_id: int, role_id: int) -> bool:
         return False
     user.roles.append(role)
     db.commit()
+    invalidate_principal(user_id)
+    request_list_cache.bump_all()
     return True
 
 def remove_role_from_user(db: Session, user_id: int, role_id: int) -> bool:
@@ -84,4 +99,6 @@ def remove_role_from_user(db: Session, user_id: int, role_id: int) -> bool:
         return False
     user.roles.remove(role)
     db.commit()
+    invalidate_principal(user_id)
+    request_list_cache.bump_all()
     return True 
\ No newline at end of file
@@ -0,0 +1,172 @@
+from typing import Any, Dict, List, Optional
+from sqlalchemy import case, delete, func, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.request import Request
+from app.models.user import User
+from app.models.user_request_stats import UserRequestStats
+
+Stats = UserRequestStats
+
+# Status -> counter column kept in user_request_stats
+STATUS_COLUMNS: Dict[str, str] = {
+    "aprobado": "approved_requests",
+    "rechazado": "rejected_requests",
+    "pendiente": "pending_requests",
+}
+
+
+def _apply(db: Session, user_id: int, values: Dict[str, Any]) -> None:
+    """
+    UPDATE the stats row of `user_id` in place. create_user() and rebuild()
+    give every user a row, so no SELECT is issued on the common path; a
+    missing row is created in a savepoint, and if a concurrent write created
+    it first the UPDATE is simply retried.
+    """
+    statement = update(Stats).where(Stats.user_id == user_id).values(**values)
+    if db.execute(statement).rowcount == 0:
+        try:
+            with db.begin_nested():
+                db.execute(insert(Stats).values(user_id=user_id))
+        except IntegrityError:
+            pass
+        db.execute(statement)
+
+
+def _status_delta(status: Optional[str], delta: int) -> Dict[str, Any]:
+    column_name = STATUS_COLUMNS.get(status)
+    if not column_name:
+        return {}
+    return {column_name: getattr(Stats, column_name) + delta}
+
+
+def _refresh_bounds(db: Session, user_id: int) -> None:
+    # Las escrituras pendientes sobre requests deben verse en el MIN/MAX
+    db.flush()
+    amounts = select(Request.amount).where(Request.user_id == user_id)
+    db.execute(
+        update(Stats)
+        .where(Stats.user_id == user_id)
+        .values(
+            amount_min=amounts.with_only_columns(func.min(Request.amount)).scalar_subquery(),
+            amount_max=amounts.with_only_columns(func.max(Request.amount)).scalar_subquery(),
+        )
+    )
+
+
+def record_created(db: Session, *, user_id: int, status: str, amounts: List[float]) -> None:
+    """
+    Account for new requests of one user. Does not commit; the caller's
+    transaction covers both the requests and their stats.
+    """
+    if not amounts:
+        return
+    low, high = min(amounts), max(amounts)
+    _apply(db, user_id, dict(
+        total_requests=Stats.total_requests + len(amounts),
+        amount_sum=Stats.amount_sum + sum(amounts),
+        amount_min=case(
+            (Stats.amount_min.is_(None), literal(low)),
+            (Stats.amount_min > low, literal(low)),
+            else_=Stats.amount_min,
+        ),
+        amount_max=case(
+            (Stats.amount_max.is_(None), literal(high)),
+            (Stats.amount_max < high, literal(high)),
+            else_=Stats.amount_max,
+        ),
+        **_status_delta(status, len(amounts)),
+    ))
+
+
+def record_status_change(
+    db: Session, *, user_id: int, previous_status: Optional[str], new_status: Optional[str], count: int = 1
+) -> None:
+    if previous_status == new_status:
+        return
+    values = _status_delta(previous_status, -count)
+    values.update(_status_delta(new_status, count))
+    if values:
+        _apply(db, user_id, values)
+
+
+def record_amount_change(db: Session, *, user_id: int, previous_amount: float, new_amount: float) -> None:
+    if previous_amount == new_amount:
+        return
+    _apply(db, user_id, dict(amount_sum=Stats.amount_sum + (new_amount - previous_amount)))
+    _refresh_bounds(db, user_id)
+
+
+def record_deleted(db: Session, *, user_id: int, status: str, amount: float) -> None:
+    _apply(db, user_id, dict(
+        total_requests=Stats.total_requests - 1,
+        amount_sum=Stats.amount_sum - amount,
+        **_status_delta(status, -1),
+    ))
+    # Min/max cannot be decremented; re-read them for this user only
+    _refresh_bounds(db, user_id)
+
+
+def rebuild(db: Session) -> int:
+    """
+    Recompute user_request_stats from the requests table, repairing any drift.
+    Every user gets a row, zeroed if it has no requests. Returns the number
+    of users with stats.
+    """
+    def status_count(status: str):
+        return func.coalesce(func.sum(case((Request.status == status, 1), else_=0)), 0)
+
+    source = (
+        select(
+            User.id,
+            func.count(Request.id),
+            status_count("aprobado"),
+            status_count("rechazado"),
+            status_count("pendiente"),
+            func.coalesce(func.sum(Request.amount), 0),
+            func.min(Request.amount),
+            func.max(Request.amount),
+            func.coalesce(func.max(Request.updated_at), func.current_timestamp()),
+        )
+        .outerjoin(Request, Request.user_id == User.id)
+        .group_by(User.id)
+    )
+    db.execute(delete(Stats))
+    db.execute(
+        insert(Stats).from_select(
+            [
+                "user_id", "total_requests", "approved_requests", "rejected_requests",
+                "pending_requests", "amount_sum", "amount_min", "amount_max", "updated_at",
+            ],
+            source,
+        )
+    )
+    db.commit()
+    return db.query(func.count(Stats.user_id)).scalar()
+
+
+def stats_statement(user_id: Optional[int] = None):
+    """
+    One row per user joined with its precomputed stats, labelled like the
+    columns of sp_GetUserRequestStats.
+    """
+    total = func.coalesce(Stats.total_requests, 0)
+    statement = (
+        select(
+            User.id.label("UserId"),
+            User.email.label("UserEmail"),
+            User.full_name.label("UserName"),
+            total.label("TotalRequests"),
+            func.coalesce(Stats.approved_requests, 0).label("ApprovedRequests"),
+            func.coalesce(Stats.rejected_requests, 0).label("RejectedRequests"),
+            func.coalesce(Stats.pending_requests, 0).label("PendingRequests"),
+            case((total > 0, Stats.amount_sum / total), else_=None).label("AverageAmount"),
+            Stats.amount_max.label("MaxAmount"),
+            Stats.amount_min.label("MinAmount"),
+        )
+        .outerjoin(Stats, Stats.user_id == User.id)
+        .order_by(User.id)
+    )
+    if user_id is not None:
+        statement = statement.where(User.id == user_id)
+    return statement
@@ -0,0 +1,232 @@
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import event, exc, insert
+from sqlalchemy.orm import Session, SessionTransaction
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.audit import AuditRequest
+
+logger = logging.getLogger(__name__)
+
+# Key in Session.info holding the audit rows of the current transaction
+PENDING_AUDITS = "pending_audits"
+
+
+class AuditWriter:
+    """
+    Write-behind queue for audit_requests rows. Rows are handed over once
+    their transaction commits and inserted in batches from a background
+    thread, every `interval` seconds or as soon as `batch_size` rows wait.
+
+    With a spool path every queued row is also appended to that file and the
+    file is replayed by start(), so rows queued but not yet written survive a
+    crash (they may be written twice). Each worker process needs its own
+    spool file.
+    """
+
+    def __init__(
+        self,
+        batch_size: int,
+        interval: float,
+        spool_path: Optional[str] = None,
+        fsync: bool = False,
+    ) -> None:
+        self.batch_size = batch_size
+        self.interval = interval
+        self.spool_path = spool_path
+        self.fsync = fsync
+        self._condition = threading.Condition()
+        self._pending: List[Dict[str, Any]] = []
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._replayed = False
+        self.written = 0
+        self.dropped = 0
+        self.failed_flushes = 0
+        self.last_error: Optional[str] = None
+
+    def start(self) -> None:
+        with self._condition:
+            if self._thread is not None:
+                return
+            if not self._replayed:
+                self._pending[:0] = self._read_spool()
+                self._replayed = True
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread and write whatever is still queued."""
+        with self._condition:
+            thread = self._thread
+            self._stopping = True
+            self._condition.notify()
+        if thread is not None:
+            thread.join()
+        self._thread = None
+        self.flush()
+
+    def submit(self, rows: List[Dict[str, Any]]) -> None:
+        if self._thread is None:
+            self.start()
+        with self._condition:
+            self._append_spool(rows)
+            self._pending.extend(rows)
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify()
+
+    def flush(self) -> int:
+        """Write every queued row now. Returns the number of rows written."""
+        total = 0
+        while True:
+            written = self._flush_batch()
+            if not written:
+                return total
+            total += written
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "enabled": settings.AUDIT_WRITE_BEHIND,
+                "queued": len(self._pending),
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed_flushes": self.failed_flushes,
+                "last_error": self.last_error,
+                "spool_path": self.spool_path,
+            }
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if not self._stopping and len(self._pending) < self.batch_size:
+                    self._condition.wait(self.interval)
+                if self._stopping:
+                    return
+            try:
+                self.flush()
+            except Exception as e:
+                # Rows stay queued; retry on the next tick
+                with self._condition:
+                    self.failed_flushes += 1
+                    self.last_error = repr(e)
+                logger.exception("Audit flush failed")
+                time.sleep(self.interval)
+
+    def _flush_batch(self) -> int:
+        with self._flush_lock:
+            with self._condition:
+                batch = self._pending[:self.batch_size]
+            if not batch:
+                return 0
+            dropped = self._insert(batch)
+            with self._condition:
+                del self._pending[:len(batch)]
+                self.written += len(batch) - dropped
+                self.dropped += dropped
+                self._rewrite_spool()
+            return len(batch)
+
+    def _insert(self, batch: List[Dict[str, Any]]) -> int:
+        """Insert `batch`; returns how many rows had to be dropped."""
+        db = SessionLocal()
+        try:
+            try:
+                db.execute(insert(AuditRequest), batch)
+                db.commit()
+                return 0
+            except exc.IntegrityError:
+                db.rollback()
+            # One bad row (e.g. its request was deleted meanwhile) must not
+            # block the queue: write the rest one by one
+            dropped = 0
+            for row in batch:
+                try:
+                    db.execute(insert(AuditRequest), [row])
+                    db.commit()
+                except exc.IntegrityError:
+                    db.rollback()
+                    dropped += 1
+                    logger.warning("Dropping audit row %r", row)
+            return dropped
+        finally:
+            db.close()
+
+    def _append_spool(self, rows: List[Dict[str, Any]]) -> None:
+        if not self.spool_path:
+            return
+        with open(self.spool_path, "a", encoding="utf-8") as spool:
+            spool.writelines(json.dumps(row, default=_encode) + "\n" for row in rows)
+            spool.flush()
+            if self.fsync:
+                os.fsync(spool.fileno())
+
+    def _rewrite_spool(self) -> None:
+        if not self.spool_path:
+            return
+        if not self._pending:
+            open(self.spool_path, "w").close()
+            return
+        tmp_path = self.spool_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as spool:
+            spool.writelines(json.dumps(row, default=_encode) + "\n" for row in self._pending)
+            spool.flush()
+            if self.fsync:
+                os.fsync(spool.fileno())
+        os.replace(tmp_path, self.spool_path)
+
+    def _read_spool(self) -> List[Dict[str, Any]]:
+        if not self.spool_path or not os.path.exists(self.spool_path):
+            return []
+        rows = []
+        with open(self.spool_path, encoding="utf-8") as spool:
+            for line in spool:
+                try:
+                    row = json.loads(line)
+                    row["created_at"] = datetime.fromisoformat(row["created_at"])
+                except (ValueError, KeyError, TypeError):
+                    # A torn last line from a crash mid-write
+                    continue
+                rows.append(row)
+        return rows
+
+
+def _encode(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+audit_writer = AuditWriter(
+    batch_size=settings.AUDIT_FLUSH_BATCH_SIZE,
+    interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+    spool_path=settings.AUDIT_SPOOL_PATH,
+    fsync=settings.AUDIT_SPOOL_FSYNC,
+)
+
+
+def queue_audits(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """Hold `rows` until `db` commits; they are discarded on rollback."""
+    db.info.setdefault(PENDING_AUDITS, []).extend(rows)
+
+
+@event.listens_for(Session, "after_commit")
+def _submit_pending_audits(session: Session) -> None:
+    rows = session.info.pop(PENDING_AUDITS, None)
+    if rows:
+        audit_writer.submit(rows)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending_audits(session: Session, transaction: SessionTransaction) -> None:
+    # A savepoint rolled back inside the transaction must not drop its rows;
+    # after a commit they have already been submitted
+    if transaction.parent is None:
+        session.info.pop(PENDING_AUDITS, None)
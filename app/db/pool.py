@@ -0,0 +1,74 @@
+import threading
+import time
+from typing import Any, Dict, Type
+from sqlalchemy import exc
+from sqlalchemy.pool import Pool, QueuePool
+
+
+class PoolStats:
+    """
+    Checkout counters for one engine's pool. Kept outside the pool instance
+    so they survive pool recreation on dispose().
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_checkout(self, waited: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def record_timeout(self, waited: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def snapshot(self, pool: Pool) -> Dict[str, Any]:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            data = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+                "wait_seconds_avg": self.wait_seconds_total / attempts if attempts else 0.0,
+            }
+        if isinstance(pool, QueuePool):
+            data.update(
+                pool_size=pool.size(),
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                overflow_in_use=max(0, pool.overflow()),
+                max_overflow=pool._max_overflow,
+            )
+        return data
+
+
+def instrumented(pool_class: Type[QueuePool], stats: PoolStats) -> Type[QueuePool]:
+    """
+    Subclass `pool_class` so every checkout records how long it waited for a
+    connection, and whether it gave up with a pool timeout.
+    """
+
+    class InstrumentedPool(pool_class):  # type: ignore[valid-type, misc]
+        pool_stats = stats
+
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except exc.TimeoutError:
+                self.pool_stats.record_timeout(time.perf_counter() - start)
+                raise
+            self.pool_stats.record_checkout(time.perf_counter() - start)
+            return connection
+
+    InstrumentedPool.__name__ = f"Instrumented{pool_class.__name__}"
+    return InstrumentedPool
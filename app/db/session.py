@@ -1,22 +1,67 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from typing import AsyncGenerator, Generator
+from sqlalchemy import AsyncAdaptedQueuePool, QueuePool, create_engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
+from app.core.request_stats import instrument_engine
+from app.db.pool import PoolStats, instrumented
+
+pool_options = dict(
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+)
 
 # Create engine with SQL Server specific settings
+engine_options = {}
+if make_url(settings.SQLALCHEMY_DATABASE_URI).get_backend_name() == "mssql":
+    # pyodbc sends executemany() parameter sets in one round trip
+    engine_options["fast_executemany"] = True
+
+pool_stats = PoolStats()
 engine = create_engine(
     settings.SQLALCHEMY_DATABASE_URI,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
-    pool_timeout=30,
-    pool_recycle=1800
+    poolclass=instrumented(QueuePool, pool_stats),
+    **pool_options,
+    **engine_options
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-def get_db():
+# Statement count, DB time and fetched rows of the current HTTP request
+instrument_engine(engine)
+
+# Async engine for the hot routes, only created when DB_ASYNC is enabled
+async_pool_stats = PoolStats()
+async_engine = None
+AsyncSessionLocal = None
+if settings.DB_ASYNC:
+    async_engine = create_async_engine(
+        settings.async_database_uri,
+        poolclass=instrumented(AsyncAdaptedQueuePool, async_pool_stats),
+        **pool_options
+    )
+    instrument_engine(async_engine.sync_engine)
+    # Objects stay usable after commit; reloading them would need awaiting
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
+def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def get_pool_stats() -> dict:
+    stats = {"sync": pool_stats.snapshot(engine.pool)}
+    if async_engine is not None:
+        stats["async"] = async_pool_stats.snapshot(async_engine.sync_engine.pool)
+    return stats
@@ -2,4 +2,5 @@ from .user import User
 from .role import Role
 from .user_role import UserRole
 from .request import Request,CommentRequest
-from .audit import AuditRequest
\ No newline at end of file
+from .audit import AuditRequest, AuditRequestArchive
+from .user_request_stats import UserRequestStats
\ No newline at end of file
@@ -1,11 +1,17 @@
 #agegar modelo de auditoria
 from datetime import datetime
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
 
 class AuditRequest(Base):
     __tablename__ = "audit_requests"
+    __table_args__ = (
+        # Historial de una solicitud (sp_GetRequestHistory) y /audit?request_id=
+        Index("ix_audit_requests_request_id_action_created_at", "request_id", "action", "created_at"),
+        Index("ix_audit_requests_user_id_created_at", "user_id", "created_at"),
+        Index("ix_audit_requests_created_at", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     action = Column(String(20), nullable=False)  # "create", "status_change"
@@ -20,4 +26,29 @@ class AuditRequest(Base):
     
     # Relationships
     request = relationship("Request", back_populates="audit_logs")
-    user = relationship("User", back_populates="request_audits")
\ No newline at end of file
+    user = relationship("User", back_populates="request_audits")
+
+
+class AuditRequestArchive(Base):
+    """
+    Audit rows older than settings.AUDIT_RETENTION_DAYS, moved out of
+    audit_requests by crud_audit.archive(). Keeps the original ids; no
+    foreign key to requests so history survives deleted requests.
+    """
+    __tablename__ = "audit_requests_archive"
+    __table_args__ = (
+        Index("ix_audit_requests_archive_request_id_created_at", "request_id", "created_at"),
+        Index("ix_audit_requests_archive_user_id_created_at", "user_id", "created_at"),
+        Index("ix_audit_requests_archive_created_at", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    action = Column(String(20), nullable=False)
+    previous_status = Column(String(20), nullable=True)
+    new_status = Column(String(20), nullable=True)
+    comment = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    request_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    user = relationship("User")
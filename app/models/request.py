@@ -1,12 +1,22 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Float,Date
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Float,Date, Text
 from sqlalchemy.orm import relationship
 
 from app.db.base_class import Base
 
 class Request(Base):
     __tablename__ = "requests"
+    __table_args__ = (
+        # Listado por usuario (keyset sobre id) y MIN/MAX de montos en user_request_stats
+        Index("ix_requests_user_id_id", "user_id", "id", mssql_include=["amount", "status"]),
+        # Listado por supervisor (keyset sobre id) y sp_GetPendingRequests
+        Index("ix_requests_supervisor_id_id", "supervisor_id", "id"),
+        Index("ix_requests_supervisor_id_status", "supervisor_id", "status", "created_at"),
+        # Filtros por estado y rango de fechas de los reportes
+        Index("ix_requests_status_created_at", "status", "created_at"),
+        Index("ix_requests_created_at", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(100), nullable=True)
@@ -16,6 +26,12 @@ class Request(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     expected_date = Column(Date, nullable=True)
+    # Denormalized from audit_requests / comment_requests for reporting,
+    # kept in sync by the status change and comment writes
+    last_status_change = Column(String(20), nullable=True)
+    last_status_change_at = Column(DateTime, nullable=True)
+    last_status_comment = Column(Text, nullable=True)
+    comment_count = Column(Integer, nullable=False, default=0, server_default="0")
     # Foreign keys
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     supervisor_id = Column(Integer, ForeignKey("users.id"), nullable=True)
@@ -28,6 +44,9 @@ class Request(Base):
 
 class CommentRequest(Base):
     __tablename__ = "comment_requests"
+    __table_args__ = (
+        Index("ix_comment_requests_request_id", "request_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     comment = Column(String(500), nullable=False)
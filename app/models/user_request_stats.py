@@ -0,0 +1,21 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer
+from sqlalchemy.orm import relationship
+from app.db.base_class import Base
+
+class UserRequestStats(Base):
+    __tablename__ = "user_request_stats"
+
+    # Una fila por usuario, mantenida por crud_user_stats en la misma
+    # transacción que las escrituras sobre requests
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    total_requests = Column(Integer, nullable=False, default=0, server_default="0")
+    approved_requests = Column(Integer, nullable=False, default=0, server_default="0")
+    rejected_requests = Column(Integer, nullable=False, default=0, server_default="0")
+    pending_requests = Column(Integer, nullable=False, default=0, server_default="0")
+    amount_sum = Column(Float, nullable=False, default=0, server_default="0")
+    amount_min = Column(Float, nullable=True)
+    amount_max = Column(Float, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    user = relationship("User")
@@ -1,5 +1,5 @@
 from datetime import datetime, date
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from pydantic import BaseModel, Field
 from app.schemas.user import User
 
@@ -56,4 +56,40 @@ class Request(RequestInDBBase):
     pass
 
 class RequestInDB(RequestInDBBase):
-    pass 
\ No newline at end of file
+    pass 
+
+class UserRequestStats(BaseModel):
+    user_id: int
+    email: str
+    full_name: str
+    total_requests: int
+    approved_requests: int
+    rejected_requests: int
+    pending_requests: int
+    average_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+    min_amount: Optional[float] = None
+
+class RequestStatusBulk(BaseModel):
+    ids: List[int]
+    status: str = Field(..., max_length=20)
+    comment: Optional[str] = Field(None, max_length=500)
+
+class BulkStatusItemResult(BaseModel):
+    id: int
+    error: Optional[str] = None
+
+class BulkStatusResult(BaseModel):
+    updated: int
+    failed: int
+    results: List[BulkStatusItemResult]
+
+class BulkItemResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    errors: Optional[List[Dict[str, Any]]] = None
+
+class BulkResult(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkItemResult]
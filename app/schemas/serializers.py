@@ -0,0 +1,89 @@
+from typing import Any, Dict, Optional, Sequence
+import orjson
+from fastapi import Response
+
+# Output-only counterparts of schemas.user.User, schemas.request.Request and
+# schemas.audit.AuditRequest. They read ORM rows loaded by the CRUD, which
+# are trusted, so they skip pydantic validation and produce the same JSON
+# (same keys in the same order) through orjson. Keep them in step with
+# the schemas.
+
+
+def role_dict(role: Any) -> Dict[str, Any]:
+    return {"id": role.id, "name": role.name, "description": role.description}
+
+
+def user_dict(user: Any) -> Dict[str, Any]:
+    return {
+        "email": user.email,
+        "full_name": user.full_name,
+        "is_active": user.is_active,
+        # UserBase.role_ids is only used for input
+        "role_ids": None,
+        "id": user.id,
+        "roles": [role_dict(role) for role in user.roles],
+    }
+
+
+def comment_dict(comment: Any) -> Dict[str, Any]:
+    return {
+        "comment": comment.comment,
+        "id": comment.id,
+        "request_id": comment.request_id,
+        "user_id": comment.user_id,
+        "created_at": comment.created_at,
+    }
+
+
+def request_dict(request: Any) -> Dict[str, Any]:
+    return {
+        "title": request.title,
+        "description": request.description,
+        "status": request.status,
+        "amount": float(request.amount),
+        "expected_date": request.expected_date,
+        "id": request.id,
+        "user_id": request.user_id,
+        "supervisor_id": request.supervisor_id,
+        "created_at": request.created_at,
+        "updated_at": request.updated_at,
+        "comments": [comment_dict(comment) for comment in request.comments],
+        "user": user_dict(request.user),
+    }
+
+
+def sparse_request_dict(request: Any, fields: Sequence[str], include: Sequence[str]) -> Dict[str, Any]:
+    """
+    request_dict() restricted to `fields` and the `include` relationships;
+    `request` may be a Request or a column row.
+    """
+    data = {field: getattr(request, field) for field in fields}
+    if data.get("amount") is not None:
+        data["amount"] = float(data["amount"])
+    if "comments" in include:
+        data["comments"] = [comment_dict(comment) for comment in request.comments]
+    if "user" in include:
+        data["user"] = user_dict(request.user)
+    return data
+
+
+def audit_dict(audit: Any) -> Dict[str, Any]:
+    return {
+        "action": audit.action,
+        "previous_status": audit.previous_status,
+        "new_status": audit.new_status,
+        "comment": audit.comment,
+        "id": audit.id,
+        "request_id": audit.request_id,
+        "user_id": audit.user_id,
+        "created_at": audit.created_at,
+        "user": user_dict(audit.user),
+    }
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content)
+
+
+def json_response(content: Any, headers: Optional[Dict[str, str]] = None) -> Response:
+    return Response(content=dumps(content), media_type="application/json", headers=headers)
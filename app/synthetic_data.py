@@ -0,0 +1,205 @@
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import Connection, Table, func, select
+from sqlalchemy.orm import Session
+from app.core.security import get_password_hash
+from app.crud import crud_role, crud_user_stats
+from app.models import AuditRequest, CommentRequest, Request, User, UserRole
+
+SYNTHETIC_PASSWORD = "user123"
+SYNTHETIC_EMAIL = "synthetic{}@example.com"
+
+# Cuota de supervisores entre los usuarios generados
+SUPERVISOR_RATIO = 0.05
+# Montos log-normales: mediana ~250, cola larga hasta AMOUNT_MAX
+AMOUNT_MU, AMOUNT_SIGMA, AMOUNT_MAX = math.log(250), 1.1, 50000.0
+HISTORY_DAYS = 730
+
+
+def _next_id(db: Session, model: Any) -> int:
+    return (db.scalar(select(func.max(model.id))) or 0) + 1
+
+
+def _insert_many(conn: Connection, table: Table, rows: List[Dict[str, Any]]) -> None:
+    """
+    executemany straight on the DBAPI cursor. Values go through each
+    column's bind processor once, skipping the per-row parameter
+    construction of Connection.execute(), which dominates at this volume.
+    """
+    if not rows:
+        return
+    compiled = table.insert().compile(dialect=conn.dialect, column_keys=list(rows[0]))
+    names = compiled.positiontup if compiled.positional else list(rows[0])
+    processors = [(name, table.c[name].type.bind_processor(conn.dialect)) for name in names]
+    if compiled.positional:
+        params = [
+            tuple(process(row[name]) if process else row[name] for name, process in processors)
+            for row in rows
+        ]
+    else:
+        params = [
+            {name: process(row[name]) if process else row[name] for name, process in processors}
+            for row in rows
+        ]
+    # SQL Server rejects explicit ids in IDENTITY columns unless enabled
+    identity = (
+        conn.dialect.name == "mssql"
+        and table.autoincrement_column is not None
+        and table.autoincrement_column.name in rows[0]
+    )
+    table_name = conn.dialect.identifier_preparer.format_table(table)
+    if identity:
+        conn.exec_driver_sql(f"SET IDENTITY_INSERT {table_name} ON")
+    conn.exec_driver_sql(compiled.string, params)
+    if identity:
+        conn.exec_driver_sql(f"SET IDENTITY_INSERT {table_name} OFF")
+
+
+def seed_synthetic(
+    db: Session,
+    *,
+    users: int,
+    requests: int,
+    batch_size: int = 10000,
+    seed: int = 0,
+    defer_indexes: bool = False,
+    progress: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Append `users` users and `requests` requests with their comments and
+    audit trail, for production-sized local databases. Rows are built in
+    Python with explicit ids and written with Core executemany, one
+    transaction per `batch_size` requests; every user shares one bcrypt
+    hash of SYNTHETIC_PASSWORD. user_request_stats is rebuilt at the end.
+    The roles of init_db() must exist.
+
+    With `defer_indexes` the secondary indexes of requests, comments and
+    audits are dropped for the load and rebuilt once at the end, which is
+    much faster for an empty or small database.
+
+    Returns the id ranges created and the supervisor ids.
+    """
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    started = time.perf_counter()
+    supervisor_role = crud_role.get_role_by_name(db, name="supervisor")
+    user_role = crud_role.get_role_by_name(db, name="user")
+    if supervisor_role is None or user_role is None:
+        raise ValueError("Run init_db first: the 'supervisor' and 'user' roles are missing")
+
+    first_user = _next_id(db, User)
+    user_ids = range(first_user, first_user + users)
+    supervisors = [
+        user_id for user_id in user_ids
+        if rng.random() < SUPERVISOR_RATIO or user_id == first_user
+    ]
+    supervisor_set = set(supervisors)
+    hashed_password = get_password_hash(SYNTHETIC_PASSWORD)
+    conn = db.connection()
+    for start in range(0, users, batch_size):
+        batch = user_ids[start:start + batch_size]
+        _insert_many(conn, User.__table__, [
+            dict(
+                id=user_id, email=SYNTHETIC_EMAIL.format(user_id), hashed_password=hashed_password,
+                full_name=f"Synthetic User {user_id}", is_active=True, created_at=now, updated_at=now,
+            )
+            for user_id in batch
+        ])
+        _insert_many(conn, UserRole.__table__, [
+            dict(user_id=user_id, role_id=supervisor_role.id if user_id in supervisor_set else user_role.id)
+            for user_id in batch
+        ])
+    db.commit()
+
+    bulk_tables = [Request.__table__, CommentRequest.__table__, AuditRequest.__table__]
+    deferred = [index for table in bulk_tables for index in table.indexes] if defer_indexes else []
+    for index in deferred:
+        index.drop(db.connection(), checkfirst=True)
+    db.commit()
+
+    first_request = _next_id(db, Request)
+    comment_id = _next_id(db, CommentRequest)
+    audit_id = _next_id(db, AuditRequest)
+    written = 0
+    while written < requests:
+        count = min(batch_size, requests - written)
+        request_rows: List[Dict[str, Any]] = []
+        comment_rows: List[Dict[str, Any]] = []
+        audit_rows: List[Dict[str, Any]] = []
+        for request_id in range(first_request + written, first_request + written + count):
+            user_id = rng.randrange(first_user, first_user + users)
+            supervisor_id = rng.choice(supervisors)
+            # Más solicitudes recientes que antiguas
+            age = timedelta(days=HISTORY_DAYS * rng.random() ** 1.5, seconds=rng.randrange(86400))
+            created_at = now - age
+            amount = round(min(AMOUNT_MAX, max(1.0, rng.lognormvariate(AMOUNT_MU, AMOUNT_SIGMA))), 2)
+            # Las solicitudes antiguas casi siempre están resueltas
+            decided = rng.random() < min(0.97, 0.2 + age.days / 30)
+            status = "pendiente"
+            if decided:
+                status = "rechazado" if rng.random() < 0.2 else "aprobado"
+            row = dict(
+                id=request_id, title=f"Solicitud {request_id}",
+                description="Solicitud de compra generada", status=status, amount=amount,
+                expected_date=(created_at + timedelta(days=rng.randrange(3, 90))).date(),
+                created_at=created_at, updated_at=created_at,
+                last_status_change=None, last_status_change_at=None, last_status_comment=None,
+                comment_count=0, user_id=user_id, supervisor_id=supervisor_id,
+            )
+            audit_rows.append(dict(
+                id=audit_id, action="create", previous_status=None, new_status="pendiente",
+                comment=None, created_at=created_at, request_id=request_id, user_id=user_id,
+            ))
+            audit_id += 1
+            if decided:
+                decided_at = min(now, created_at + timedelta(hours=rng.randrange(1, 24 * 14)))
+                comment = None
+                if status == "rechazado" or amount > 500 or rng.random() < 0.1:
+                    comment = "Revisado por el supervisor"
+                    comment_rows.append(dict(
+                        id=comment_id, comment=comment, created_at=decided_at,
+                        request_id=request_id, user_id=supervisor_id,
+                    ))
+                    comment_id += 1
+                    row["comment_count"] = 1
+                audit_rows.append(dict(
+                    id=audit_id, action="status_change", previous_status="pendiente",
+                    new_status=status, comment=comment, created_at=decided_at,
+                    request_id=request_id, user_id=supervisor_id,
+                ))
+                audit_id += 1
+                row.update(
+                    updated_at=decided_at, last_status_change=status,
+                    last_status_change_at=decided_at, last_status_comment=comment,
+                )
+            request_rows.append(row)
+
+        conn = db.connection()
+        _insert_many(conn, Request.__table__, request_rows)
+        _insert_many(conn, CommentRequest.__table__, comment_rows)
+        _insert_many(conn, AuditRequest.__table__, audit_rows)
+        db.commit()
+        written += count
+        if progress:
+            elapsed = time.perf_counter() - started
+            progress(f"{written}/{requests} requests ({written / elapsed:,.0f} rows/s)")
+
+    if deferred:
+        if progress:
+            progress(f"Rebuilding {len(deferred)} indexes")
+        for index in deferred:
+            index.create(db.connection())
+        db.commit()
+
+    crud_user_stats.rebuild(db)
+    return {
+        "first_user_id": first_user,
+        "users": users,
+        "supervisor_ids": supervisors,
+        "first_request_id": first_request,
+        "requests": requests,
+        "seconds": time.perf_counter() - started,
+    }
@@ -0,0 +1,22 @@
+from datetime import datetime, timedelta
+from app.core.config import settings
+from app.crud import crud_audit
+from app.db.session import SessionLocal
+
+
+def archive_audit():
+    older_than = datetime.utcnow() - timedelta(days=settings.AUDIT_RETENTION_DAYS)
+    db = SessionLocal()
+    try:
+        moved = crud_audit.archive(
+            db,
+            older_than=older_than,
+            batch_size=settings.AUDIT_ARCHIVE_BATCH_SIZE,
+            sleep_seconds=settings.AUDIT_ARCHIVE_SLEEP_SECONDS,
+        )
+        print(f"{moved} audit rows older than {older_than:%Y-%m-%d} moved to audit_requests_archive")
+    finally:
+        db.close()
+
+if __name__ == '__main__':
+    archive_audit()
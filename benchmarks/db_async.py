@@ -0,0 +1,148 @@
+"""
+Sync vs async database path at high concurrency, against a local SQLite file.
+
+    python -m benchmarks.db_async --requests 2000 --concurrency 200
+
+Each mode runs in its own interpreter because DB_ASYNC is read at import
+time. Needs httpx and aiosqlite installed.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Dict, List
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def seed(n_requests: int) -> Dict[str, int]:
+    from app.core.security import get_password_hash
+    from app.db.base_class import Base
+    from app.db.session import SessionLocal, engine
+    from app.models import Request, Role, User
+
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        supervisor = Role(name="supervisor", description="Supervisor de solicitudes")
+        user = User(
+            email="bench@example.com",
+            hashed_password=get_password_hash("bench123"),
+            full_name="Bench User",
+            is_active=True,
+            roles=[supervisor],
+        )
+        db.add(user)
+        db.flush()
+        db.add_all(
+            Request(
+                title=f"Request {i}",
+                description="Benchmark request",
+                amount=100 + i % 900,
+                expected_date=date.today() + timedelta(days=30),
+                user_id=user.id,
+            )
+            for i in range(n_requests)
+        )
+        db.commit()
+        return {"user_id": user.id}
+    finally:
+        db.close()
+
+
+async def drive(n_requests: int, concurrency: int, seeded: int, user_id: int) -> Dict[str, float]:
+    import httpx
+    from app.core.security import create_access_token
+    from main import app
+
+    headers = {"Authorization": f"Bearer {create_access_token(user_id)}"}
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def one(i: int) -> None:
+            nonlocal errors
+            if i % 2:
+                url = f"/api/v1/requests/{i % seeded + 1}"
+            else:
+                url = "/api/v1/requests/?limit=20"
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(url, headers=headers)
+                latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(n_requests)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "requests": n_requests,
+        "errors": errors,
+        "seconds": elapsed,
+        "rps": n_requests / elapsed,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def run_worker(args: argparse.Namespace) -> None:
+    seeded = seed(args.seed)
+    result = asyncio.run(drive(args.requests, args.concurrency, args.seed, seeded["user_id"]))
+    print(json.dumps(result))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1000, help="requests rows to create")
+    parser.add_argument("--worker", choices=["sync", "async"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    results = {}
+    for mode in ("sync", "async"):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(
+                os.environ,
+                DB_ASYNC="true" if mode == "async" else "false",
+                SQLALCHEMY_DATABASE_URI=f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            )
+            worker = subprocess.run(
+                [sys.executable, "-m", "benchmarks.db_async", "--worker", mode,
+                 "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+                 "--seed", str(args.seed)],
+                env=env, capture_output=True, text=True,
+            )
+            if worker.returncode != 0:
+                sys.exit(f"{mode} run failed:\n{worker.stderr}")
+            results[mode] = json.loads(worker.stdout.strip().splitlines()[-1])
+
+    print(f"{'mode':<6} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for mode, result in results.items():
+        print(
+            f"{mode:<6} {result['rps']:9.1f} {result['p50_ms']:9.2f} "
+            f"{result['p95_ms']:9.2f} {result['p99_ms']:9.2f} {result['errors']:7d}"
+        )
+
+
+if __name__ == "__main__":
+    main()
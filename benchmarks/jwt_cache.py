@@ -0,0 +1,36 @@
+"""
+Per-request auth overhead with and without the verified-token cache.
+
+    python -m benchmarks.jwt_cache --iterations 20000
+"""
+import argparse
+import timeit
+
+from jose import jwt
+
+from app.core import security
+from app.core.config import settings
+from app.schemas.token import TokenPayload
+
+
+def uncached(token: str) -> TokenPayload:
+    claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[security.ALGORITHM])
+    return TokenPayload(**claims)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    token = security.create_access_token(1)
+    security.token_cache.clear()
+    security.decode_token(token)
+
+    for name, fn in (("jwt.decode", uncached), ("decode_token (cached)", security.decode_token)):
+        seconds = timeit.timeit(lambda: fn(token), number=args.iterations)
+        print(f"{name:<24} {seconds / args.iterations * 1e6:8.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
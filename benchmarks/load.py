@@ -0,0 +1,343 @@
+"""
+End-to-end HTTP load test of main.py against a local SQLite database.
+
+    python -m benchmarks.load --requests 5000 --concurrency 50 --output run.json
+    python -m benchmarks.load --server uvicorn --compare run.json
+
+Seeds users, requests, comments and audit rows, then replays a weighted mix
+of login, list, get, create, status change and CSV report calls. Prints
+throughput and p50/p95/p99 latency per route and can save the results as
+JSON (and diff them against an earlier run). `--server asgi` drives the app
+in-process through httpx; `--server uvicorn` starts a local uvicorn and
+goes through TCP. Needs httpx installed.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.db_async import percentile
+
+# Route -> relative weight in the traffic mix
+DEFAULT_MIX = "list=30,get=30,create=15,status=10,login=5,report=1"
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def seed(n_users: int, n_requests: int) -> Dict[str, Any]:
+    """
+    Create the schema, the initial roles and users, then n_users synthetic
+    users and n_requests requests with app.synthetic_data.
+    """
+    from app.db.base_class import Base
+    from app.db.session import SessionLocal, engine
+    from app.initial_data import init_db
+    from app.synthetic_data import seed_synthetic
+
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        init_db(db)
+        return seed_synthetic(db, users=n_users, requests=n_requests, defer_indexes=True)
+    finally:
+        db.close()
+
+
+class Traffic:
+    """Picks and issues the calls of the mix; one instance per run."""
+
+    def __init__(self, client: Any, seeded: Dict[str, Any], mix: Dict[str, float], seed: int) -> None:
+        from app.core.security import create_access_token
+
+        self.client = client
+        self.seeded = seeded
+        self.rng = random.Random(seed)
+        self.names = list(mix)
+        self.weights = list(mix.values())
+        # Tokens are minted directly; only the login operation pays for bcrypt
+        self.user_ids = range(seeded["first_user_id"], seeded["first_user_id"] + seeded["users"])
+        self.request_ids = range(seeded["first_request_id"], seeded["first_request_id"] + seeded["requests"])
+        self.user_headers = {
+            i: {"Authorization": f"Bearer {create_access_token(i)}"} for i in self.user_ids
+        }
+        self.expected_date = str(date.today() + timedelta(days=30))
+
+    def pick(self) -> str:
+        return self.rng.choices(self.names, self.weights)[0]
+
+    def user(self) -> Tuple[int, Dict[str, str]]:
+        user_id = self.rng.choice(self.user_ids)
+        return user_id, self.user_headers[user_id]
+
+    def supervisor(self) -> Dict[str, str]:
+        return self.user_headers[self.rng.choice(self.seeded["supervisor_ids"])]
+
+    def request_id(self) -> int:
+        return self.rng.choice(self.request_ids)
+
+    async def call(self, name: str) -> int:
+        return await OPERATIONS[name](self)
+
+
+async def op_login(t: Traffic) -> int:
+    from app.synthetic_data import SYNTHETIC_EMAIL, SYNTHETIC_PASSWORD
+
+    user_id, _ = t.user()
+    response = await t.client.post(
+        "/api/v1/auth/login",
+        data={"username": SYNTHETIC_EMAIL.format(user_id), "password": SYNTHETIC_PASSWORD}
+    )
+    return response.status_code
+
+
+async def op_list(t: Traffic) -> int:
+    user_id, headers = t.user()
+    params = {"limit": 20}
+    if t.rng.random() < 0.5:
+        params["user_id"] = user_id
+    response = await t.client.get("/api/v1/requests/", params=params, headers=headers)
+    return response.status_code
+
+
+async def op_get(t: Traffic) -> int:
+    _, headers = t.user()
+    response = await t.client.get(f"/api/v1/requests/{t.request_id()}", headers=headers)
+    return response.status_code
+
+
+async def op_create(t: Traffic) -> int:
+    _, headers = t.user()
+    response = await t.client.post("/api/v1/requests/", headers=headers, json={
+        "title": "Load request",
+        "description": "Created by benchmarks.load",
+        "amount": round(t.rng.uniform(10, 2000), 2),
+        "expected_date": t.expected_date,
+    })
+    return response.status_code
+
+
+async def op_status(t: Traffic) -> int:
+    response = await t.client.put(
+        f"/api/v1/requests/{t.request_id()}/status",
+        headers=t.supervisor(),
+        json={"status": t.rng.choice(["aprobado", "rechazado"]), "comment": "Load test review"},
+    )
+    return response.status_code
+
+
+async def op_report(t: Traffic) -> int:
+    start_date = date.today() - timedelta(days=30)
+    response = await t.client.get(
+        "/api/v1/requests/report/csv",
+        params={"start_date": str(start_date), "status": "aprobado"},
+        headers=t.supervisor(),
+    )
+    return response.status_code
+
+
+OPERATIONS = {
+    "login": op_login,
+    "list": op_list,
+    "get": op_get,
+    "create": op_create,
+    "status": op_status,
+    "report": op_report,
+}
+
+
+async def drive(
+    client: Any, seeded: Dict[str, Any], mix: Dict[str, float], n_requests: int,
+    concurrency: int, warmup: int, seed: int,
+) -> Dict[str, Any]:
+    traffic = Traffic(client, seeded, mix, seed)
+    for name in mix:
+        for _ in range(warmup):
+            await traffic.call(name)
+
+    latencies: Dict[str, List[float]] = {name: [] for name in mix}
+    errors: Dict[str, Dict[str, int]] = {name: {} for name in mix}
+    plan = [traffic.pick() for _ in range(n_requests)]
+    queue: "asyncio.Queue[str]" = asyncio.Queue()
+    for name in plan:
+        queue.put_nowait(name)
+
+    async def worker() -> None:
+        while not queue.empty():
+            name = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                status = str(await traffic.call(name))
+            except Exception as e:
+                status = type(e).__name__
+            latencies[name].append(time.perf_counter() - start)
+            if not status.startswith("2"):
+                errors[name][status] = errors[name].get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    routes = {}
+    for name, samples in latencies.items():
+        if not samples:
+            continue
+        routes[name] = {
+            "count": len(samples),
+            "errors": sum(errors[name].values()),
+            "error_statuses": errors[name],
+            "rps": len(samples) / elapsed,
+            "mean_ms": statistics.mean(samples) * 1000,
+            "p50_ms": percentile(samples, 50) * 1000,
+            "p95_ms": percentile(samples, 95) * 1000,
+            "p99_ms": percentile(samples, 99) * 1000,
+        }
+    everything = [sample for samples in latencies.values() for sample in samples]
+    return {
+        "seconds": elapsed,
+        "total": {
+            "count": len(everything),
+            "errors": sum(route["errors"] for route in routes.values()),
+            "rps": len(everything) / elapsed,
+            "p50_ms": percentile(everything, 50) * 1000,
+            "p95_ms": percentile(everything, 95) * 1000,
+            "p99_ms": percentile(everything, 99) * 1000,
+        },
+        "routes": routes,
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_uvicorn(port: int, workers: int) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        env=os.environ.copy(),
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if server.poll() is not None:
+            sys.exit("uvicorn exited during startup")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.terminate()
+    sys.exit("uvicorn did not start within 30 seconds")
+
+
+async def run(args: argparse.Namespace, seeded: Dict[str, Any]) -> Dict[str, Any]:
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    if args.server == "asgi":
+        from main import app
+
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://load", timeout=None
+        )
+        async with client:
+            return await drive(client, seeded, args.mix, args.requests, args.concurrency, args.warmup, args.seed)
+
+    port = free_port()
+    server = start_uvicorn(port, args.workers)
+    try:
+        client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=None)
+        async with client:
+            return await drive(client, seeded, args.mix, args.requests, args.concurrency, args.warmup, args.seed)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def print_results(results: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    header = f"{'route':<8} {'count':>7} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}"
+    if baseline:
+        header += f" {'p95 vs base':>12}"
+    print(header)
+    rows = list(results["routes"].items()) + [("total", results["total"])]
+    for name, route in rows:
+        line = (
+            f"{name:<8} {route['count']:7d} {route['rps']:9.1f} {route['p50_ms']:9.2f} "
+            f"{route['p95_ms']:9.2f} {route['p99_ms']:9.2f} {route['errors']:7d}"
+        )
+        if baseline:
+            base = baseline["total"] if name == "total" else baseline["routes"].get(name)
+            if base:
+                line += f" {(route['p95_ms'] / base['p95_ms'] - 1) * 100:+11.1f}%"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--server", choices=["asgi", "uvicorn"], default="asgi")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--requests", type=int, default=5000, help="calls to issue")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5, help="untimed calls per operation")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"operation weights (default {DEFAULT_MIX})")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--seed-requests", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42, help="random seed of the traffic")
+    parser.add_argument("--database", help="SQLite file to use (default: a temporary one)")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to diff against")
+    args = parser.parse_args()
+
+    # The app reads its settings at import time, so configure it first
+    path = args.database or os.path.join(tempfile.mkdtemp(), "load.db")
+    if os.path.exists(path):
+        sys.exit(f"{path} already exists; the harness seeds a fresh database")
+    os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{path}"
+
+    seeded = seed(args.users, args.seed_requests)
+    results = asyncio.run(run(args, seeded))
+    results["config"] = {
+        "server": args.server,
+        "workers": args.workers,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "mix": args.mix,
+        "users": args.users,
+        "seed_requests": args.seed_requests,
+        "db_async": os.environ.get("DB_ASYNC", "false"),
+        "python": platform.python_version(),
+        "started_at": datetime.utcnow().isoformat(),
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
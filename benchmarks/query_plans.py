@@ -0,0 +1,27 @@
+"""
+Query-plan regression check for the indexed access paths, on SQLite.
+
+    python -m benchmarks.query_plans [--verbose]
+
+Runs tests/test_query_plans.py, which captures every statement of the real
+CRUD reads (and SQL equivalents of the stored procedure filters) against a
+scratch SQLite database and fails on any full table scan in their EXPLAIN
+QUERY PLAN. --verbose prints every plan.
+"""
+import argparse
+import sys
+
+
+def main() -> None:
+    import pytest
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+
+    options = ["-v", "-s"] if args.verbose else ["-q"]
+    sys.exit(pytest.main([*options, "tests/test_query_plans.py"]))
+
+
+if __name__ == "__main__":
+    main()
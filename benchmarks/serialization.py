@@ -0,0 +1,110 @@
+"""
+Cost of serializing request, user and audit pages to JSON.
+
+    python -m benchmarks.serialization --rows 100 --iterations 200
+
+Compares what FastAPI does for a `response_model` (pydantic validation of
+the ORM rows, JSON-mode dump, json.dumps), pydantic's own dump_json, and
+the app.schemas.serializers + orjson path used by the list endpoints. The
+rows are in-memory ORM objects, so only serialization is measured. Fails if
+the three paths do not produce the same JSON.
+"""
+import argparse
+import json
+import timeit
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+
+def build_rows(n: int) -> Dict[str, List[Any]]:
+    from app.models import AuditRequest, CommentRequest, Request, Role, User
+
+    supervisor_role = Role(id=1, name="supervisor", description="Supervisor de solicitudes")
+    user_role = Role(id=2, name="user", description="Usuario normal")
+    users = [
+        User(
+            id=i, email=f"user{i}@example.com", full_name=f"User {i}", is_active=True,
+            roles=[supervisor_role if i % 10 == 0 else user_role],
+        )
+        for i in range(1, 11)
+    ]
+    now = datetime(2024, 5, 17, 10, 30, 15, 123456)
+    requests = []
+    for i in range(1, n + 1):
+        request = Request(
+            id=i, title=f"Solicitud {i}", description="Compra de material de oficina",
+            status=("pendiente", "aprobado", "rechazado")[i % 3], amount=100.0 + i * 7.25,
+            expected_date=date(2024, 6, 1) + timedelta(days=i % 30),
+            created_at=now, updated_at=now + timedelta(hours=i),
+            user_id=users[i % 10].id, supervisor_id=users[0].id, user=users[i % 10],
+        )
+        request.comments = [
+            CommentRequest(id=i * 2 + k, comment="Revisado", request_id=i, user_id=1, created_at=now)
+            for k in range(i % 3)
+        ]
+        requests.append(request)
+    audits = [
+        AuditRequest(
+            id=i, action="status_change", previous_status="pendiente", new_status="aprobado",
+            comment=None, created_at=now, request_id=i, user_id=users[i % 10].id, user=users[i % 10],
+        )
+        for i in range(1, n + 1)
+    ]
+    return {"request": requests, "user": users * (n // 10 or 1), "audit": audits}
+
+
+def paths(kind: str) -> Dict[str, Callable[[List[Any]], bytes]]:
+    from pydantic import TypeAdapter
+
+    from app import schemas
+    from app.schemas import serializers
+
+    schema, serializer = {
+        "request": (schemas.request.Request, serializers.request_dict),
+        "user": (schemas.user.User, serializers.user_dict),
+        "audit": (schemas.audit.AuditRequest, serializers.audit_dict),
+    }[kind]
+    adapter = TypeAdapter(List[schema])
+
+    def response_model(rows: List[Any]) -> bytes:
+        content = adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def pydantic_dump_json(rows: List[Any]) -> bytes:
+        return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+    def orjson_serializers(rows: List[Any]) -> bytes:
+        return serializers.dumps([serializer(row) for row in rows])
+
+    return {
+        "response_model + json": response_model,
+        "pydantic dump_json": pydantic_dump_json,
+        "serializers + orjson": orjson_serializers,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100, help="rows per page")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = build_rows(args.rows)
+    for kind, page in rows.items():
+        candidates = paths(kind)
+        outputs = {name: json.loads(fn(page)) for name, fn in candidates.items()}
+        reference = outputs["response_model + json"]
+        for name, output in outputs.items():
+            if output != reference:
+                raise SystemExit(f"{kind}: {name} does not match the response_model output")
+
+        print(f"{kind} page of {len(page)} rows")
+        baseline = None
+        for name, fn in candidates.items():
+            seconds = timeit.timeit(lambda: fn(page), number=args.iterations) / args.iterations
+            baseline = baseline or seconds
+            print(f"  {name:<24} {seconds * 1000:8.3f} ms/page  {baseline / seconds:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
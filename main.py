@@ -1,10 +1,22 @@
-from fastapi import FastAPI
+import logging
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy.exc import SQLAlchemyError
 from app.core.config import settings
+from app.core.metrics import CONTENT_TYPE, render_metrics
+from app.core.principal import principal_cache
+from app.core.response_cache import request_list_cache
+from app.core.roles import role_catalogue
+from app.core.request_stats import RequestStatsMiddleware
+from app.core.security import PasswordHasherBusy, shutdown_password_hasher, token_cache
 from app.api.v1.api import api_router
-from app.db.session import SessionLocal
+from app.db.audit_writer import audit_writer
+from app.db.session import SessionLocal, get_pool_stats
 from app.initial_data import init_db
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
@@ -18,11 +30,44 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing", "ETag"],
 )
+app.add_middleware(RequestStatsMiddleware)
 
 # Incluir el router de la API
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Authentication service busy, retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.on_event("startup")
+def load_role_catalogue():
+    # Without a database the catalogue is loaded with the first principal
+    db = SessionLocal()
+    try:
+        role_catalogue.load(db)
+    except SQLAlchemyError:
+        logger.warning("Role catalogue not loaded at startup", exc_info=True)
+    finally:
+        db.close()
+
+@app.on_event("startup")
+def start_audit_writer():
+    # Replays the spool file left by a previous run, if any
+    if settings.AUDIT_WRITE_BEHIND:
+        audit_writer.start()
+
+@app.on_event("shutdown")
+def shutdown_event():
+    shutdown_password_hasher()
+    if settings.AUDIT_WRITE_BEHIND:
+        audit_writer.stop()
+
 # @app.on_event("startup")
 # async def startup_event():
 #     db = SessionLocal()
@@ -34,6 +79,17 @@ def root():
     return {"message": "Welcome to Purchase Request API"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    # async so that the thread pool gauges are read from the event loop
+    caches = {
+        "principal": principal_cache.stats(),
+        "token": token_cache.stats(),
+        "request_list": request_list_cache.stats(),
+    }
+    return Response(render_metrics(get_pool_stats(), caches), media_type=CONTENT_TYPE)
+
+
 @app.get("/hello/{name}")
 async def say_hello(name: str):
     return {"message": f"Hello {name}"}
@@ -0,0 +1,14 @@
+from app.crud import crud_user_stats
+from app.db.session import SessionLocal
+
+
+def rebuild_user_stats():
+    db = SessionLocal()
+    try:
+        users = crud_user_stats.rebuild(db)
+        print(f"user_request_stats rebuilt for {users} users")
+    finally:
+        db.close()
+
+if __name__ == '__main__':
+    rebuild_user_stats()
@@ -29,39 +29,12 @@ BEGIN
         s.email AS SupervisorEmail,
         s.full_name AS SupervisorName,
         
-        -- Último cambio de estado
-        (
-            SELECT TOP 1 ar.new_status 
-            FROM audit_requests ar 
-            WHERE ar.request_id = r.id 
-            AND ar.action = 'status_change'
-            ORDER BY ar.created_at DESC
-        ) AS LastStatusChange,
-        
-        -- Fecha del último cambio de estado
-        (
-            SELECT TOP 1 ar.created_at 
-            FROM audit_requests ar 
-            WHERE ar.request_id = r.id 
-            AND ar.action = 'status_change'
-            ORDER BY ar.created_at DESC
-        ) AS LastStatusChangeDate,
-        
-        -- Comentario del último cambio de estado
-        (
-            SELECT TOP 1 ar.comment 
-            FROM audit_requests ar 
-            WHERE ar.request_id = r.id 
-            AND ar.action = 'status_change'
-            ORDER BY ar.created_at DESC
-        ) AS LastStatusComment,
-        
-        -- Cantidad de comentarios
-        (
-            SELECT COUNT(*) 
-            FROM comment_requests cr 
-            WHERE cr.request_id = r.id
-        ) AS CommentCount,
+        -- Último cambio de estado y cantidad de comentarios
+        -- (columnas desnormalizadas, mantenidas por la API)
+        r.last_status_change AS LastStatusChange,
+        r.last_status_change_at AS LastStatusChangeDate,
+        r.last_status_comment AS LastStatusComment,
+        r.comment_count AS CommentCount,
         
         -- Tiempo en días desde la creación
         DATEDIFF(day, r.created_at, GETDATE()) AS DaysSinceCreation,
@@ -89,24 +62,24 @@ AS
 BEGIN
     SET NOCOUNT ON;
 
+    -- Lee la tabla user_request_stats, mantenida por la API en la misma
+    -- transacción que las escrituras sobre requests
     SELECT 
         u.id AS UserId,
         u.email AS UserEmail,
         u.full_name AS UserName,
-        COUNT(r.id) AS TotalRequests,
-        SUM(CASE WHEN r.status = 'aprobado' THEN 1 ELSE 0 END) AS ApprovedRequests,
-        SUM(CASE WHEN r.status = 'rechazado' THEN 1 ELSE 0 END) AS RejectedRequests,
-        SUM(CASE WHEN r.status = 'pendiente' THEN 1 ELSE 0 END) AS PendingRequests,
-        AVG(r.amount) AS AverageAmount,
-        MAX(r.amount) AS MaxAmount,
-        MIN(r.amount) AS MinAmount
+        ISNULL(st.total_requests, 0) AS TotalRequests,
+        ISNULL(st.approved_requests, 0) AS ApprovedRequests,
+        ISNULL(st.rejected_requests, 0) AS RejectedRequests,
+        ISNULL(st.pending_requests, 0) AS PendingRequests,
+        CASE WHEN st.total_requests > 0 THEN st.amount_sum / st.total_requests END AS AverageAmount,
+        st.amount_max AS MaxAmount,
+        st.amount_min AS MinAmount
     FROM 
         users u
-        LEFT JOIN requests r ON u.id = r.user_id
+        LEFT JOIN user_request_stats st ON u.id = st.user_id
     WHERE 
-        (@UserId IS NULL OR u.id = @UserId)
-    GROUP BY 
-        u.id, u.email, u.full_name;
+        (@UserId IS NULL OR u.id = @UserId);
 END
 GO
 
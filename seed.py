@@ -1,11 +1,43 @@
+import argparse
 from app.db.session import SessionLocal
 from app.initial_data import init_db
+from app.synthetic_data import SYNTHETIC_EMAIL, SYNTHETIC_PASSWORD, seed_synthetic
 
 
-def seed():
+def seed(
+    users: int = 0, requests: int = 0, batch_size: int = 10000, random_seed: int = 0,
+    defer_indexes: bool = False
+):
     db = SessionLocal()
-    init_db(db)
-    db.close()
+    try:
+        init_db(db)
+        if users or requests:
+            result = seed_synthetic(
+                db,
+                users=max(users, 1),
+                requests=requests,
+                batch_size=batch_size,
+                seed=random_seed,
+                defer_indexes=defer_indexes,
+                progress=print,
+            )
+            print(
+                f"{result['users']} users and {result['requests']} requests created "
+                f"in {result['seconds']:.0f}s; password for "
+                f"{SYNTHETIC_EMAIL.format('<id>')}: {SYNTHETIC_PASSWORD}"
+            )
+    finally:
+        db.close()
 
 if __name__ == '__main__':
-    seed()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Create the initial roles and users, plus optional synthetic data")
+    parser.add_argument("--users", type=int, default=0, help="synthetic users to create")
+    parser.add_argument("--requests", type=int, default=0, help="synthetic requests to create")
+    parser.add_argument("--batch-size", type=int, default=10000, help="requests per insert batch")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument(
+        "--defer-indexes", action="store_true",
+        help="drop the request/comment/audit indexes during the load and rebuild them at the end"
+    )
+    args = parser.parse_args()
+    seed(args.users, args.requests, args.batch_size, args.seed, args.defer_indexes)
@@ -0,0 +1,93 @@
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import date
+from typing import Any, Iterator, List
+
+import pytest
+
+# The engines are built when app.db.session is imported, so point them at a
+# scratch SQLite database before any app module is loaded
+os.environ["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "tests.db")
+os.environ["DB_ASYNC"] = "false"
+
+from sqlalchemy import event  # noqa: E402
+
+from app.crud import crud_user_stats  # noqa: E402
+from app.db.base_class import Base  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.models import CommentRequest, Request, Role, User  # noqa: E402
+
+SEED_REQUESTS = 100
+
+
+class StatementLog:
+    """Statements, their parameters and COMMITs sent to the engine while capturing."""
+
+    def __init__(self) -> None:
+        self.statements: List[str] = []
+        self.parameters: List[Any] = []
+        self.commits = 0
+
+
+@contextmanager
+def capture_statements() -> Iterator[StatementLog]:
+    log = StatementLog()
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        log.statements.append(statement)
+        log.parameters.append(parameters)
+
+    def on_commit(conn):
+        log.commits += 1
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    event.listen(engine, "commit", on_commit)
+    try:
+        yield log
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+        event.remove(engine, "commit", on_commit)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def seeded_db() -> None:
+    """
+    SEED_REQUESTS requests spread over 10 users with two roles, each with
+    one to three comments, and their user_request_stats.
+    """
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    roles = [Role(name="supervisor", description="Supervisor"), Role(name="user", description="Usuario")]
+    users = [
+        User(
+            email=f"user{i}@example.com", hashed_password="x", full_name=f"User {i}",
+            roles=[roles[0]] if i == 0 else [roles[1]] if i % 2 else roles,
+        )
+        for i in range(10)
+    ]
+    db.add_all(users)
+    db.flush()
+    for i in range(SEED_REQUESTS):
+        request = Request(
+            title=f"Solicitud {i}", description="Material de oficina", status="pendiente",
+            amount=100 + i * 10, expected_date=date(2024, 6, 1),
+            user_id=users[1 + i % 9].id, supervisor_id=users[0].id,
+        )
+        request.comments = [
+            CommentRequest(comment=f"Comentario {k}", user_id=users[0].id) for k in range(1 + i % 3)
+        ]
+        request.comment_count = len(request.comments)
+        db.add(request)
+    db.commit()
+    crud_user_stats.rebuild(db)
+    db.close()
+
+
+@pytest.fixture
+def db() -> Iterator:
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
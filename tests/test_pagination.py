@@ -0,0 +1,43 @@
+import base64
+
+import pytest
+
+from app.core.pagination import MAX_ID, decode_cursor, encode_cursor
+
+
+def raw_cursor(payload: str) -> str:
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(42)) == 42
+    assert decode_cursor(encode_cursor(MAX_ID)) == MAX_ID
+    assert decode_cursor(None) is None
+    assert decode_cursor("") is None
+
+
+@pytest.mark.parametrize("payload", [
+    '{"id":1e999}',
+    '{"id":-1e999}',
+    '{"id":1.5}',
+    '{"id":true}',
+    '{"id":"5"}',
+    '{"id":null}',
+    '{"id":-1}',
+    '{"id":%d}' % (MAX_ID + 1),
+    '{"id":%s}' % ("9" * 5000),
+    '{"other":1}',
+    '[1]',
+    '"id"',
+    "[" * 100000,
+    "not json",
+])
+def test_malformed_cursor_is_rejected(payload):
+    with pytest.raises(ValueError):
+        decode_cursor(raw_cursor(payload))
+
+
+@pytest.mark.parametrize("cursor", ["%%%", "a", "\\u00e9"])
+def test_undecodable_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
@@ -0,0 +1,136 @@
+"""
+Query-plan regression checks for the indexed access paths, on SQLite.
+
+Runs the real CRUD reads (and SQL equivalents of the stored procedure
+filters), captures every statement they issue and fails if the EXPLAIN
+QUERY PLAN of any of them does a full table scan.
+"""
+import re
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+
+import pytest
+from sqlalchemy import select, text
+
+from app.crud import crud_request, crud_user_stats
+from app.crud.crud_audit import audit
+from app.db.session import SessionLocal
+from app.models import AuditRequest, CommentRequest, Request, Role, User
+from tests.conftest import capture_statements
+
+# "SCAN requests" is a full scan; "SCAN requests USING INDEX ..." walks an
+# index in order and "SEARCH ..." seeks it
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+PLANNED_STATEMENTS = ("SELECT", "UPDATE", "DELETE")
+PLAN_USERS = 1000
+PLAN_REQUESTS = 2000
+
+
+def access_paths() -> Dict[str, Callable[[Any], Any]]:
+    start = datetime.utcnow() - timedelta(days=30)
+    return {
+        "requests by user": lambda db: crud_request.get_multi(db, user_id=1),
+        "requests by user, next page": lambda db: crud_request.get_multi(db, user_id=1, after_id=10),
+        "requests by supervisor": lambda db: crud_request.get_multi(db, supervisor_id=1),
+        "request detail": lambda db: crud_request.get(db, 1),
+        "stats min/max refresh": lambda db: crud_user_stats._refresh_bounds(db, 1),
+        "audit by request": lambda db: audit.get_multi(db, request_id=1),
+        "audit by user": lambda db: audit.get_multi(db, user_id=1),
+        "audit latest": lambda db: audit.get_multi(db),
+        # Filters of the stored procedures in scripts/create_stored_procedures.sql
+        "report by date range": lambda db: db.execute(
+            select(Request).where(Request.created_at >= start)
+        ).all(),
+        "report by status and date": lambda db: db.execute(
+            select(Request).where(Request.status == "aprobado", Request.created_at >= start)
+        ).all(),
+        "pending by supervisor": lambda db: db.execute(
+            select(Request)
+            .where(Request.status == "pendiente", Request.supervisor_id == 1)
+            .order_by(Request.created_at)
+        ).all(),
+        "status history": lambda db: db.execute(
+            select(AuditRequest)
+            .where(AuditRequest.request_id == 1, AuditRequest.action == "status_change")
+            .order_by(AuditRequest.created_at.desc())
+        ).all(),
+        "comments of a request": lambda db: db.execute(
+            select(CommentRequest)
+            .where(CommentRequest.request_id == 1)
+            .order_by(CommentRequest.created_at.desc())
+        ).all(),
+    }
+
+
+ACCESS_PATHS = access_paths()
+
+
+@pytest.fixture(scope="module")
+def planned_db():
+    """
+    Enough extra rows per table that ANALYZE gives the planner real
+    statistics, on top of the shared seed.
+    """
+    db = SessionLocal()
+    roles = db.execute(select(Role).order_by(Role.id)).scalars().all()
+    users = [
+        User(
+            email=f"plan{i}@example.com", hashed_password="x", full_name=f"Plan {i}",
+            roles=[roles[i % len(roles)]],
+        )
+        for i in range(PLAN_USERS)
+    ]
+    db.add_all(users)
+    db.flush()
+    for i in range(PLAN_REQUESTS):
+        owner, supervisor = users[i % PLAN_USERS], users[(i + 1) % 20]
+        request = Request(
+            description="Plan request",
+            status=("pendiente", "aprobado", "rechazado")[i % 3],
+            amount=100 + i % 900,
+            expected_date=date.today(),
+            created_at=datetime.utcnow() - timedelta(days=i % 365),
+            user_id=owner.id,
+            supervisor_id=supervisor.id,
+        )
+        request.comments.append(CommentRequest(comment="ok", user_id=supervisor.id))
+        request.audit_logs.append(AuditRequest(action="create", new_status="pendiente", user_id=owner.id))
+        db.add(request)
+    db.commit()
+    crud_user_stats.rebuild(db)
+    db.execute(text("ANALYZE"))
+    db.commit()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def query_plans(db: Any, run: Callable[[Any], Any]) -> List[Tuple[str, List[str]]]:
+    """Statements issued by `run`, each with its EXPLAIN QUERY PLAN lines."""
+    with capture_statements() as log:
+        run(db)
+    db.rollback()
+    plans = []
+    for statement, parameters in zip(log.statements, log.parameters):
+        if not statement.lstrip().upper().startswith(PLANNED_STATEMENTS):
+            continue
+        plan = [
+            row[3] for row in
+            db.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)
+        ]
+        plans.append((" ".join(statement.split()), plan))
+    db.rollback()
+    return plans
+
+
+@pytest.mark.parametrize("name", list(ACCESS_PATHS))
+def test_access_path_has_no_full_scan(planned_db, name):
+    plans = query_plans(planned_db, ACCESS_PATHS[name])
+
+    assert plans, f"{name} issued no statements"
+    for statement, plan in plans:
+        # Shown with pytest -s
+        print(f"{name}\n     {statement}\n" + "".join(f"       {line}\n" for line in plan))
+        scans = [line for line in plan if FULL_SCAN.match(line)]
+        assert not scans, f"{name}: full scan in {statement}: {scans}"
@@ -0,0 +1,42 @@
+import pytest
+
+from app.crud import crud_request
+from app.schemas.serializers import request_dict
+from tests.conftest import capture_statements
+
+# requests, users of the page, roles of those users, comments of the page
+LIST_STATEMENTS = 4
+# request joined with its owner, roles of the owner, comments
+DETAIL_STATEMENTS = 3
+
+
+@pytest.mark.parametrize("limit", [1, 10, 100])
+def test_list_page_statement_count_is_constant(db, limit):
+    with capture_statements() as log:
+        page = crud_request.get_multi(db, limit=limit)
+        # Touch everything the response serializes, so lazy loads would show
+        body = [request_dict(request) for request in page]
+
+    assert len(body) == limit
+    assert len(log.statements) == LIST_STATEMENTS
+
+
+def test_list_page_statement_count_with_filters(db):
+    first = crud_request.get_multi(db, user_id=2, limit=5)
+    with capture_statements() as log:
+        page = crud_request.get_multi(db, user_id=2, after_id=first[-1].id, limit=5)
+        [request_dict(request) for request in page]
+
+    assert page
+    assert len(log.statements) == LIST_STATEMENTS
+
+
+def test_detail_statement_count(db):
+    with capture_statements() as log:
+        request = crud_request.get(db, 50)
+        body = request_dict(request)
+
+    assert body["id"] == 50
+    assert body["comments"]
+    assert body["user"]["roles"]
+    assert len(log.statements) == DETAIL_STATEMENTS
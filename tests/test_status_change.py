@@ -0,0 +1,57 @@
+from sqlalchemy import func, select
+
+from app.crud import crud_request
+from app.crud.base import unit_of_work
+from app.db.session import SessionLocal
+from app.models import AuditRequest, CommentRequest, Request, UserRequestStats
+from app.schemas.request import RequestUpdate
+from tests.conftest import capture_statements
+
+REQUEST_ID = 60
+# Reads: request with its owner, the owner's roles, comments.
+# Writes: audit row, user_request_stats, request, comment.
+STATUS_CHANGE_STATEMENTS = 7
+
+
+def test_status_change_is_one_transaction(db):
+    request = crud_request.get(db, REQUEST_ID)
+    owner_id, comment_count = request.user_id, request.comment_count
+    stats = db.get(UserRequestStats, owner_id)
+    approved, pending = stats.approved_requests, stats.pending_requests
+    db.rollback()
+    db.expunge_all()
+    obj_in = RequestUpdate(status="aprobado", comment="Aprobado por presupuesto")
+
+    with capture_statements() as log:
+        # What PUT /requests/{id}/status runs
+        request = crud_request.get(db, REQUEST_ID)
+        assert crud_request.status_change_error(request, obj_in) is None
+        with unit_of_work(db):
+            crud_request.change_status(db, db_obj=request, obj_in=obj_in, user_id=1)
+
+    assert log.commits == 1
+    assert len(log.statements) == STATUS_CHANGE_STATEMENTS
+
+    check = SessionLocal()
+    try:
+        changed = check.get(Request, REQUEST_ID)
+        assert changed.status == "aprobado"
+        assert changed.comment_count == comment_count + 1
+        assert changed.last_status_change == "aprobado"
+        assert changed.last_status_change_at is not None
+        assert changed.last_status_comment == "Aprobado por presupuesto"
+        assert check.scalar(
+            select(func.count(CommentRequest.id))
+            .where(CommentRequest.request_id == REQUEST_ID)
+        ) == comment_count + 1
+        audit = check.execute(
+            select(AuditRequest).where(AuditRequest.request_id == REQUEST_ID)
+        ).scalar_one()
+        assert (audit.action, audit.previous_status, audit.new_status) == (
+            "status_change", "pendiente", "aprobado"
+        )
+        assert audit.comment == "Aprobado por presupuesto"
+        stats = check.get(UserRequestStats, owner_id)
+        assert (stats.approved_requests, stats.pending_requests) == (approved + 1, pending - 1)
+    finally:
+        check.close()
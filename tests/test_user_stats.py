@@ -0,0 +1,59 @@
+from sqlalchemy import Update
+
+from app.core.config import settings
+from app.core.response_cache import GLOBAL, request_list_cache
+from app.crud import crud_request
+from app.crud.base import unit_of_work
+from app.db import audit_writer as audit_writer_module
+from app.models import UserRequestStats
+from app.schemas.request import RequestUpdate
+
+REQUEST_ID = 70
+
+
+def _miss_first_stats_update(db, monkeypatch):
+    """
+    Make the first UPDATE of user_request_stats match no row, as when a
+    concurrent first write creates the row between the UPDATE and the
+    INSERT of crud_user_stats._apply: the INSERT then hits the existing row.
+    """
+    execute = db.execute
+    state = {"missed": False}
+
+    class NoRows:
+        rowcount = 0
+
+    def racing_execute(statement, *args, **kwargs):
+        if (
+            not state["missed"] and isinstance(statement, Update)
+            and statement.table.name == UserRequestStats.__tablename__
+        ):
+            state["missed"] = True
+            return NoRows()
+        return execute(statement, *args, **kwargs)
+
+    monkeypatch.setattr(db, "execute", racing_execute)
+    return state
+
+
+def test_stats_race_keeps_pending_audits_and_cache_bumps(db, monkeypatch):
+    submitted = []
+    monkeypatch.setattr(settings, "AUDIT_WRITE_BEHIND", True)
+    monkeypatch.setattr(audit_writer_module.audit_writer, "submit", submitted.extend)
+    version = request_list_cache.key((), (GLOBAL,))
+
+    request = crud_request.get(db, REQUEST_ID)
+    owner_id = request.user_id
+    approved = db.get(UserRequestStats, owner_id).approved_requests
+    state = _miss_first_stats_update(db, monkeypatch)
+    with unit_of_work(db):
+        crud_request.change_status(
+            db, db_obj=request, obj_in=RequestUpdate(status="aprobado", comment="ok"), user_id=1
+        )
+
+    # The savepoint of the duplicate INSERT rolled back, the transaction committed
+    assert state["missed"]
+    assert [(row["action"], row["request_id"]) for row in submitted] == [("status_change", REQUEST_ID)]
+    assert request_list_cache.key((), (GLOBAL,)) != version
+    db.expire_all()
+    assert db.get(UserRequestStats, owner_id).approved_requests == approved + 1